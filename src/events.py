@@ -0,0 +1,141 @@
+import threading
+
+
+HABIT_ADDED = 'habit_added'
+HABIT_UPDATED = 'habit_updated'
+HABIT_REMOVED = 'habit_removed'
+REWARD_ADDED = 'reward_added'
+REWARD_UPDATED = 'reward_updated'  # Replaced, e.g. re-created with another difficulty
+REWARD_EXCHANGED = 'reward_exchanged'
+REWARD_REMOVED = 'reward_removed'
+PROGRESS_CHANGED = 'progress_changed'  # XP, level, HP or coins changed
+
+ADDED_KINDS = (HABIT_ADDED, REWARD_ADDED)
+REMOVED_KINDS = (HABIT_REMOVED, REWARD_REMOVED)
+
+
+class ChangeEvent:
+    # A single change to the tracker state, e.g. a habit that was added or updated.
+
+    def __init__(self, kind, key=None, data=None):
+        """
+        Initializes a change event.
+
+        Args:
+            kind (str): One of the event kinds defined in this module.
+            key (str, optional): The name of the habit or reward that changed. None for progress events.
+            data (dict, optional): The new state of the item (e.g. Habit.to_row()), or None if removed.
+        """
+        self.kind = kind
+        self.key = key
+        self.data = data
+
+    @property
+    def target(self):
+        """The kind of item this event is about ('habit', 'reward' or 'progress')."""
+        return self.kind.split('_')[0]
+
+    def __eq__(self, other):
+        return (isinstance(other, ChangeEvent)
+                and (self.kind, self.key, self.data) == (other.kind, other.key, other.data))
+
+    def __repr__(self):
+        return f"ChangeEvent({self.kind!r}, {self.key!r}, {self.data!r})"
+
+
+def coalesce(previous, event):
+    """
+    Merges two pending events about the same item into the one that describes the net change.
+
+    Args:
+        previous (ChangeEvent): The event already waiting to be delivered.
+        event (ChangeEvent): The newer event.
+
+    Returns:
+        ChangeEvent: The merged event, or None if the changes cancel out (added then removed).
+    """
+    if previous.kind in ADDED_KINDS:
+        if event.kind in REMOVED_KINDS:
+            return None
+        return ChangeEvent(previous.kind, event.key, event.data)
+    if previous.kind in REMOVED_KINDS and event.kind in ADDED_KINDS:
+        return ChangeEvent(HABIT_UPDATED if event.target == 'habit' else REWARD_UPDATED, event.key, event.data)
+    return event
+
+
+class EventBus:
+    # In-process publish/subscribe bus. Events are queued as they happen and delivered
+    # to listeners in coalesced batches when flush() is called, e.g. once per GUI frame.
+
+    def __init__(self):
+        self.listeners = []
+        self._pending = {}  # (target, key) -> ChangeEvent, in order of first change
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def subscribe(self, listener):
+        """
+        Registers a listener that will receive a list of ChangeEvent objects per batch.
+
+        Args:
+            listener (callable): Called with the list of coalesced events.
+
+        Returns:
+            callable: A function that unsubscribes the listener.
+        """
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def publish(self, event):
+        """
+        Queues an event, merging it with any pending event about the same item.
+
+        Args:
+            event (ChangeEvent): The event to publish.
+        """
+        slot = (event.target, event.key)
+        with self._lock:
+            previous = self._pending.pop(slot, None)
+            merged = coalesce(previous, event) if previous else event
+            if merged is not None:
+                self._pending[slot] = merged
+
+    def flush(self):
+        """
+        Delivers all pending events to every listener as a single batch.
+
+        Returns:
+            list: The events that were delivered (empty if nothing changed).
+        """
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending.clear()
+        if batch:
+            for listener in list(self.listeners):
+                listener(batch)
+        return batch
+
+    def start(self, interval=0.1):
+        """
+        Flushes automatically every `interval` seconds on a background thread.
+
+        Useful for API clients; a Tk GUI should call flush() from its own event loop instead,
+        because Tk widgets may only be touched from the main thread.
+
+        Args:
+            interval (float, optional): Seconds between flushes. Defaults to 0.1.
+        """
+        def tick():
+            self.flush()
+            if self._timer is not None:
+                self.start(interval)
+
+        self._timer = threading.Timer(interval, tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop(self):
+        """Stops the automatic flushing started by start()."""
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+from datetime import date
+from habit_tracker import HabitTracker
+from history_store import TieredHistoryStore
+
+
+# Columns written for each export kind (CSV header and NDJSON keys)
+fields = {
+    'habits': ['name', 'periodicity', 'streak', 'last_completed', 'completions'],
+    'completions': ['habit', 'periodicity', 'date'],
+    'rewards': ['name', 'difficulty', 'cost', 'last_exchanged'],
+    'statistics': ['habit', 'periodicity', 'completions', 'current_streak', 'longest_streak',
+                   'first_completed', 'last_completed'],
+    'summary': ['habits', 'completions', 'longest_streak', 'average_streak', 'success_rate',
+                'level', 'total_xp', 'exp_needed', 'current_hp', 'coins']
+}
+
+
+def habit_matches(habit, periodicity=None, prefix=None):
+    """
+    Checks a habit against the periodicity and name prefix filters.
+
+    Args:
+        habit (Habit): The habit to check.
+        periodicity (str, optional): Only accept habits with this periodicity.
+        prefix (str, optional): Only accept habits whose name starts with this text (case-insensitive).
+
+    Returns:
+        bool: True if the habit passes every filter that was given.
+    """
+    if periodicity and habit.periodicity != periodicity:
+        return False
+    if prefix and not habit.name.lower().startswith(prefix.lower()):
+        return False
+    return True
+
+
+def iter_completion_dates(tracker, habit, start=None, end=None):
+    """
+    Yields the completion dates of a habit one at a time, reading cold storage lazily.
+
+    Args:
+        tracker (HabitTracker or StateSnapshot): The tracker that owns the habit, or a snapshot of it.
+        habit (Habit or HabitRecord): The habit to read. A snapshot record reads the cold segments
+                                      it recorded, not the ones the store has now.
+        start (date, optional): First date to include.
+        end (date, optional): Last date to include.
+
+    Yields:
+        date: The completion dates, oldest first.
+    """
+    if tracker.history_store is not None:
+        segments = getattr(habit, 'cold_segments', None)
+        yield from tracker.history_store.iter_history(habit, start, end, segments)
+        return
+    for day in habit.completion_dates:
+        if (start is None or day >= start) and (end is None or day <= end):
+            yield day
+
+
+def period_index(day, periodicity):
+    """
+    Numbers the period a date falls in, so consecutive periods differ by exactly one.
+
+    Args:
+        day (date): The date.
+        periodicity (str): 'daily', 'weekly' or 'monthly'.
+
+    Returns:
+        int: The period number.
+    """
+    if periodicity == 'weekly':
+        return (day.toordinal() - day.weekday()) // 7  # Weeks start on Monday
+    if periodicity == 'monthly':
+        return day.year * 12 + day.month
+    return day.toordinal()
+
+
+def iter_habits(tracker, periodicity=None, prefix=None, **_):
+    """Yields one row per habit that passes the filters."""
+    for habit in tracker.habits:
+        if habit_matches(habit, periodicity, prefix):
+            count = (tracker.history_store.count(habit, getattr(habit, 'cold_segments', None))
+                     if tracker.history_store is not None else len(habit.completion_dates))
+            yield {
+                'name': habit.name,
+                'periodicity': habit.periodicity,
+                'streak': habit.current_streak,
+                'last_completed': habit.last_completed_date.strftime('%Y-%m-%d %H:%M:%S')
+                if habit.last_completed_date else None,
+                'completions': count
+            }
+
+
+def iter_completions(tracker, start=None, end=None, periodicity=None, prefix=None):
+    """Yields one row per completion event, habit by habit, within the date range."""
+    for habit in tracker.habits:
+        if habit_matches(habit, periodicity, prefix):
+            for day in iter_completion_dates(tracker, habit, start, end):
+                yield {'habit': habit.name, 'periodicity': habit.periodicity, 'date': day.isoformat()}
+
+
+def iter_rewards(tracker, prefix=None, **_):
+    """Yields one row per reward whose name starts with the prefix."""
+    for reward in tracker.rewards:
+        if prefix and not reward['name'].lower().startswith(prefix.lower()):
+            continue
+        yield {
+            'name': reward['name'],
+            'difficulty': reward['difficulty'],
+            'cost': tracker.reward_costs.get(reward['difficulty'], 0),
+            'last_exchanged': reward['last_exchanged']
+        }
+
+
+def iter_statistics(tracker, start=None, end=None, periodicity=None, prefix=None):
+    """
+    Yields per-habit statistics computed in a single pass over each habit's history.
+
+    The longest streak counts consecutive periods with a completion inside the date range.
+    """
+    for habit in tracker.habits:
+        if not habit_matches(habit, periodicity, prefix):
+            continue
+        count = 0
+        longest = run = 0
+        previous = None
+        first = last = None
+        for day in iter_completion_dates(tracker, habit, start, end):
+            period = period_index(day, habit.periodicity)
+            if previous is None or period - previous > 1:
+                run = 1
+            elif period - previous == 1:
+                run += 1
+            previous = period
+            longest = max(longest, run)
+            count += 1
+            first = first or day
+            last = day
+        yield {
+            'habit': habit.name,
+            'periodicity': habit.periodicity,
+            'completions': count,
+            'current_streak': habit.current_streak,
+            'longest_streak': longest,
+            'first_completed': first.isoformat() if first else None,
+            'last_completed': last.isoformat() if last else None
+        }
+
+
+def iter_summary(tracker, **filters):
+    """Yields a single row aggregating the statistics of the filtered habits."""
+    habits = completions = longest = total_streak = completed = 0
+    for row in iter_statistics(tracker, **filters):
+        habits += 1
+        completions += row['completions']
+        longest = max(longest, row['longest_streak'])
+        total_streak += row['current_streak']
+        completed += 1 if row['completions'] else 0
+    yield {
+        'habits': habits,
+        'completions': completions,
+        'longest_streak': longest,
+        'average_streak': round(total_streak / habits, 2) if habits else 0,
+        'success_rate': round(completed / habits * 100, 2) if habits else 0,
+        'level': tracker.level,
+        'total_xp': tracker.total_xp,
+        'exp_needed': tracker.exp_needed,
+        'current_hp': tracker.current_hp,
+        'coins': tracker.coins
+    }
+
+
+exporters = {
+    'habits': iter_habits,
+    'completions': iter_completions,
+    'rewards': iter_rewards,
+    'statistics': iter_statistics,
+    'summary': iter_summary
+}
+
+
+def write_ndjson(rows, file):
+    """
+    Writes rows as newline-delimited JSON, one object per line.
+
+    Args:
+        rows (iterable): The rows to write.
+        file (file object): A text file open for writing.
+
+    Returns:
+        int: The number of rows written.
+    """
+    count = 0
+    for row in rows:
+        file.write(json.dumps(row))
+        file.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(rows, file, fieldnames):
+    """
+    Writes rows as CSV with a header line.
+
+    Args:
+        rows (iterable): The rows to write.
+        file (file object): A text file open for writing (opened with newline='').
+        fieldnames (list): The column names.
+
+    Returns:
+        int: The number of rows written.
+    """
+    writer = csv.DictWriter(file, fieldnames=fieldnames)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def export(tracker, kind, file, fmt='ndjson', start=None, end=None, periodicity=None, prefix=None):
+    """
+    Streams one kind of data from the tracker to a file.
+
+    Rows are read from a snapshot of the tracker, so the export is consistent even if habits
+    are completed while it runs, and it never holds up those writes.
+
+    Args:
+        tracker (HabitTracker): The tracker to export.
+        kind (str): 'habits', 'completions', 'rewards', 'statistics' or 'summary'.
+        file (file object): A text file open for writing.
+        fmt (str, optional): 'ndjson' or 'csv'. Defaults to 'ndjson'.
+        start (date, optional): First completion date to include.
+        end (date, optional): Last completion date to include.
+        periodicity (str, optional): Only export habits with this periodicity.
+        prefix (str, optional): Only export habits (or rewards) whose name starts with this text.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if kind not in exporters:
+        raise ValueError(f"Unknown export '{kind}'. Choose from: {', '.join(exporters)}.")
+    rows = exporters[kind](tracker.snapshot(), start=start, end=end, periodicity=periodicity, prefix=prefix)
+    if fmt == 'csv':
+        return write_csv(rows, file, fields[kind])
+    if fmt == 'ndjson':
+        return write_ndjson(rows, file)
+    raise ValueError(f"Unknown format '{fmt}'. Use 'ndjson' or 'csv'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export habit tracker data as NDJSON or CSV")
+    parser.add_argument('file', help='The tracker JSON file to read')
+    parser.add_argument('kind', choices=list(exporters), help='What to export')
+    parser.add_argument('--format', dest='fmt', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--start', type=date.fromisoformat, help='First date to include (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat, help='Last date to include (YYYY-MM-DD)')
+    parser.add_argument('--periodicity', choices=['daily', 'weekly', 'monthly'])
+    parser.add_argument('--prefix', help='Only include names starting with this text')
+    parser.add_argument('--output', '-o', help='Output file (defaults to standard output)')
+    parser.add_argument('--history-dir', help='History store folder holding the older completion dates')
+    args = parser.parse_args()
+    if args.history_dir and not os.path.isdir(args.history_dir):
+        parser.error(f"history directory '{args.history_dir}' does not exist")
+
+    # Loading messages (e.g. unreadable dates) must not end up in the exported data
+    with contextlib.redirect_stdout(sys.stderr):
+        store = TieredHistoryStore(args.history_dir) if args.history_dir else None
+        tracker = HabitTracker(filename=args.file, history_store=store)
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        export(tracker, args.kind, output, args.fmt, args.start, args.end, args.periodicity, args.prefix)
+    finally:
+        if args.output:
+            output.close()
@@ -2,15 +2,24 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from habit_tracker import HabitTracker
 from habit import Habit
+from events import EventBus, HABIT_ADDED, HABIT_UPDATED, HABIT_REMOVED, PROGRESS_CHANGED
 import os
 
 class HabitTrackerGUI:
+    poll_interval_ms = 100 # How often pending changes are applied to the widgets
+    search_page_size = 50 # Search results shown at first and added by "More Results"
+
     def __init__(self, root):
         self.tracker = HabitTracker()
         # Construct the path to the JSON file relative to this script's directory
         script_dir = os.path.dirname(__file__) 
         self.json_path = os.path.join(script_dir, 'habits_dataset.json')
         self.tracker.load_from_json(self.json_path)
+        # Widgets are updated from change events instead of being re-rendered after each action
+        self.tracker.event_bus = EventBus()
+        self.tracker.event_bus.subscribe(self.apply_changes)
+        self.habit_rows = [] # Habit names in Listbox order
+        self.search_limit = self.search_page_size
 
         self.root = root
         self.root.title("Habit Tracker")
@@ -20,6 +29,16 @@ class HabitTrackerGUI:
         main_frame = ttk.Frame(root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
 
+        # --- Search ---
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, padx=10)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.more_button = ttk.Button(search_frame, text="More Results", command=self.show_more_results)
+        self.more_button.pack(side=tk.LEFT)
+        self.search_var.trace_add("write", lambda *args: self.search_changed()) # Filter on every keystroke
+
         # --- Habit List ---
         list_frame = ttk.LabelFrame(main_frame, text="Habits")
         list_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
@@ -57,17 +76,84 @@ class HabitTrackerGUI:
         # --- Save on Close ---
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        self.root.after(self.poll_interval_ms, self.poll_changes)
+
+
+    def search_changed(self):
+        # A new query starts again from the first page of results
+        self.search_limit = self.search_page_size
+        self.refresh_habit_list()
+
 
     def refresh_habit_list(self):
         self.habit_listbox.delete(0, tk.END) # Clear existing items
-        habits = self.tracker.get_all_habits()
+        query = self.search_var.get().strip()
+        # Searches only fetch one page of results, so a keystroke stays cheap with thousands of habits
+        habits = self.tracker.search_habits(query, limit=self.search_limit) if query else self.tracker.get_all_habits()
+        self.habit_rows = [habit.name for habit in habits]
         if not habits:
-            self.habit_listbox.insert(tk.END, "No habits yet. Add one!")
+            self.habit_listbox.insert(tk.END, "No matching habits." if query else "No habits yet. Add one!")
         else:
             for habit in habits:
-                 # Display format: Name (Periodicity) - Streak: X
-                 display_text = f"{habit.name} ({habit.periodicity}) - Streak: {habit.current_streak}"
-                 self.habit_listbox.insert(tk.END, display_text)
+                 self.habit_listbox.insert(tk.END, self.format_habit(habit.to_row()))
+        self.update_more_button(query, len(habits))
+
+
+    def show_more_results(self):
+        # Append the next page; the first results stay where they are
+        query = self.search_var.get().strip()
+        self.search_limit += self.search_page_size
+        habits = self.tracker.search_habits(query, limit=self.search_limit)
+        for habit in habits[len(self.habit_rows):]:
+            self.habit_rows.append(habit.name)
+            self.habit_listbox.insert(tk.END, self.format_habit(habit.to_row()))
+        self.update_more_button(query, len(habits))
+
+
+    def update_more_button(self, query, shown):
+        # More results can only exist when the current page is full
+        self.more_button.state(["!disabled"] if query and shown >= self.search_limit else ["disabled"])
+
+
+    def format_habit(self, habit_data):
+        # Display format: Name (Periodicity) - Streak: X
+        return f"{habit_data['name']} ({habit_data['periodicity']}) - Streak: {habit_data['streak']}"
+
+
+    def poll_changes(self):
+        # Pick up edits made by other processes, then apply everything that changed since the last frame
+        self.tracker.reload_if_changed()
+        self.tracker.event_bus.flush()
+        self.root.after(self.poll_interval_ms, self.poll_changes)
+
+
+    def apply_changes(self, batch):
+        # Update only the Listbox rows and status bar affected by the coalesced events
+        if self.search_var.get().strip():
+            # Changes can move habits in or out of the search results, so re-run the (indexed) search
+            if any(event.target == "habit" for event in batch):
+                self.refresh_habit_list()
+            if any(event.kind == PROGRESS_CHANGED for event in batch):
+                self.update_status_bar()
+            return
+        for event in batch:
+            if event.kind == HABIT_ADDED:
+                if not self.habit_rows:
+                    self.habit_listbox.delete(0, tk.END) # Remove the placeholder text
+                self.habit_rows.append(event.key)
+                self.habit_listbox.insert(tk.END, self.format_habit(event.data))
+            elif event.kind == HABIT_UPDATED and event.key in self.habit_rows:
+                index = self.habit_rows.index(event.key)
+                self.habit_listbox.delete(index)
+                self.habit_listbox.insert(index, self.format_habit(event.data))
+            elif event.kind == HABIT_REMOVED and event.key in self.habit_rows:
+                index = self.habit_rows.index(event.key)
+                del self.habit_rows[index]
+                self.habit_listbox.delete(index)
+                if not self.habit_rows:
+                    self.habit_listbox.insert(tk.END, "No habits yet. Add one!")
+            elif event.kind == PROGRESS_CHANGED:
+                self.update_status_bar()
 
 
     def update_status_bar(self):
@@ -89,8 +175,6 @@ class HabitTrackerGUI:
 
         if name and periodicity:
             self.tracker.add_habit(name, periodicity)
-            self.refresh_habit_list()
-            self.update_status_bar() # XP might change if level up happens indirectly? (Review logic)
             messagebox.showinfo("Success", f"Habit '{name}' added.")
 
 
@@ -108,8 +192,6 @@ class HabitTrackerGUI:
         if habit:
             completed, message = self.tracker.mark_habit(habit_name)
             if completed:
-                self.refresh_habit_list()
-                self.update_status_bar()
                 messagebox.showinfo("Habit Marked", message)
             else:
                 messagebox.showinfo("Habit Not Marked", message) # Show reason if not completed (e.g., already done)
@@ -128,8 +210,6 @@ class HabitTrackerGUI:
 
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the habit '{habit_name}'?"):
             if self.tracker.delete_habit(habit_name):
-                self.refresh_habit_list()
-                self.update_status_bar() # In case deletion affects something? Unlikely but good practice.
                 messagebox.showinfo("Success", f"Habit '{habit_name}' deleted.")
             else:
                  messagebox.showerror("Error", f"Could not delete habit '{habit_name}'.")
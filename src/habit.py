@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 class Habit:
     # Represents a single habit with its properties and behaviors.
     # Changed habit_type to periodicity for consistency
-    def __init__(self, name, periodicity, streak=0, last_completed=None):
+    def __init__(self, name, periodicity, streak=0, last_completed=None, completion_dates=None):
         """
         Initializes a new Habit instance.
 
@@ -13,12 +13,15 @@ class Habit:
             periodicity (str): The frequency of the habit ('daily', 'weekly').
             streak (int, optional): The current streak count. Defaults to 0.
             last_completed (datetime, optional): The last date the habit was completed. Defaults to None.
+            completion_dates (list, optional): The dates (datetime.date) the habit was completed on,
+                                               oldest first. Defaults to an empty list.
         """
         self.name = name
         # Use periodicity consistently
         self.periodicity = periodicity
         self.current_streak = streak # Renamed for clarity
         self.last_completed_date = last_completed # Renamed for clarity
+        self.completion_dates = list(completion_dates) if completion_dates else []
 
         # Define XP values directly within the class
         self.xp_values = {
@@ -73,6 +76,7 @@ class Habit:
             message = "First completion! Streak started."
 
         self.last_completed_date = completed_at
+        self.completion_dates.append(completed_date)
         xp_gained = self.calculate_xp()
         return True, message, xp_gained
 
@@ -125,8 +129,17 @@ class Habit:
         streak_bonus = self.current_streak // 5
         return base_xp + streak_bonus
 
-    def to_dict(self):
-        """Converts the Habit object to a dictionary for JSON serialization."""
+    def to_dict(self, since=0):
+        """
+        Converts the Habit object to a dictionary for JSON serialization.
+
+        Args:
+            since (int, optional): Only include the completion dates from this position on. Defaults to 0 (all).
+        """
+        return dict(self.to_row(), completion_dates=[day.strftime('%Y-%m-%d') for day in self.completion_dates[since:]])
+
+    def to_row(self):
+        """Returns the fields shown for the habit in a list, without its completion history."""
         return {
             'name': self.name,
             'periodicity': self.periodicity, # Use periodicity
@@ -150,6 +163,13 @@ class Habit:
                      print(f"Warning: Could not parse last_completed date '{data['last_completed']}' for habit '{data.get('name')}'. Setting to None.")
                      last_completed = None # Or handle error differently
 
+        completion_dates = []
+        for day in data.get('completion_dates', []):
+            try:
+                completion_dates.append(datetime.strptime(day, '%Y-%m-%d').date())
+            except ValueError:
+                print(f"Warning: Could not parse completion date '{day}' for habit '{data.get('name')}'. Skipping it.")
+
         # Handle potential missing keys or old format ('habit_type')
         periodicity = data.get('periodicity') or data.get('habit_type', 'daily') # Default to daily if missing
 
@@ -157,5 +177,6 @@ class Habit:
             name=data.get('name', 'Unnamed Habit'),
             periodicity=periodicity,
             streak=data.get('streak', 0),
-            last_completed=last_completed
+            last_completed=last_completed,
+            completion_dates=completion_dates
         )
\ No newline at end of file
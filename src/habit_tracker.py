@@ -1,6 +1,23 @@
+import contextlib
+import functools
 import json
+import os
+import threading
 from habit import Habit
 from datetime import datetime
+import events
+from search import SearchIndex
+from snapshot import StateSnapshot
+
+
+def synchronized(method):
+    # Runs a tracker method as a single write: writers take turns, and readers see
+    # its changes in one new snapshot once the method returns.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.writing():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class HabitTracker:
@@ -13,11 +30,26 @@ class HabitTracker:
         'medium': 100,
         'hard': 150
     }
+    coins_per_completion = 10
 
-    def __init__(self):
+    def __init__(self, filename='habits.json', history=None, history_store=None, clock=None, event_bus=None):
         """
         Initializes the HabitTracker instance with default values.
         Loads data from JSON file at initialization.
+
+        Args:
+            filename (str, optional): The JSON file to load at startup and to save to after each change.
+                                      Pass None to start from the default state without touching the disk.
+            history (HabitHistory, optional): Event log that records every successful operation
+                                              so past states can be reconstructed. It continues from
+                                              the loaded file and is saved next to it. Defaults to None.
+            history_store (TieredHistoryStore, optional): Store that keeps only recent completion dates
+                                                          in memory and older ones in compressed files.
+                                                          Defaults to None (full history in memory).
+            clock (callable, optional): Returns the current datetime for completions and exchanges.
+                                        Defaults to datetime.now; tests and simulations can pass a fake clock.
+            event_bus (EventBus, optional): Bus that receives a ChangeEvent for every change to habits,
+                                            rewards and progress. Defaults to None.
         """
         self.habits = []
         self.total_xp = 0
@@ -26,7 +58,21 @@ class HabitTracker:
         self.current_hp = 10  # Starting HP
         self.coins = 0
         self.exp_needed = 100  # Example starting experience needed to level up
-        self.load_from_json()  # Load data at initialization
+        self.history = history
+        self.history_store = history_store
+        self._search_index = None  # Built on the first search, then kept up to date
+        self.write_lock = threading.RLock()
+        self._write_depth = 0
+        self._snapshot = None  # Created on the first snapshot() call, then replaced on every write
+        self._draft = None  # Snapshot being built by the current write
+        self.clock = clock or datetime.now
+        self.event_bus = event_bus
+        self.replica = None  # Set by sync.Replica; changes then go through its operation log
+        self.filename = filename
+        self._file_mtime = None
+        self._save_pending = False
+        if filename:
+            self.load_from_json(filename)  # Load data at initialization
 
     def get_default_data(self):
         """
@@ -64,47 +110,273 @@ class HabitTracker:
 
     def save_data(self, data, filename):
         """
-        Saves data to a JSON file.
+        Saves data to a JSON file. The data is written to a temporary file first and then
+        moved into place, so other processes reading the file never see it half-written.
 
         Args:
             data (dict): The data to save.
             filename (str): The name of the file to save the data to.
         """
-        with open(filename, 'w') as file:
+        temp_path = filename + '.tmp'
+        with open(temp_path, 'w') as file:
             json.dump(data, file)
+        os.replace(temp_path, filename)
 
     def load_from_json(self, filename='habits.json'):
         """
         Loads habit tracker data from a JSON file and initializes the tracker state.
+        Later changes are saved back to the same file.
         """
+        self.filename = filename
         data = self.load_data(filename)
         if data:
-            self.total_xp = data['total_xp']
-            self.rewards = data['rewards']
-            self.level = data['level']
-            self.current_hp = data['current_hp']
-            self.coins = data['coins']
-            self.exp_needed = data['exp_needed']
-            self.habits = [
-                Habit.from_dict(habit_data)
-                for habit_data in data['habits']
-            ]
-
-    def save_to_json(self, filename='habits.json'):
+            self.load_state(data)
+        self._file_mtime = self.get_file_mtime()
+        if self.history is not None:
+            self.load_history()
+
+    def save_to_json(self, filename=None):
         """
         Saves the current state of the habit tracker to a JSON file.
+
+        Args:
+            filename (str, optional): The file to write. Defaults to the file the tracker was loaded
+                                      from; nothing is written if the tracker has no file. During a
+                                      write (see writing()), that file is saved once when it ends.
+        """
+        filename = filename or self.filename
+        if filename == self.filename and self._write_depth:
+            self._save_pending = True  # Saved once, when the current write ends
+            return
+        if filename:
+            self.save_data(self.get_state(), filename)
+            if filename == self.filename:
+                self._file_mtime = self.get_file_mtime()  # Our own save is not an outside change
+                if self.history is not None:
+                    self.history.save(self.get_history_path())
+
+    def get_history_path(self):
+        """Returns the file the history is saved to, next to the tracker file (e.g. habits.history.ndjson)."""
+        return f"{os.path.splitext(self.filename)[0]}.history.ndjson"
+
+    def load_history(self):
+        """
+        Loads the saved history of the tracker file, if there is one, and makes it continue
+        from the state that was just loaded, so replaying it starts from the real habits.
+        """
+        if not self.history.events and self.filename:
+            try:
+                self.history.load_file(self.get_history_path())
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass  # No saved history yet: the log starts from the loaded state
+        self.history.rebase(self.get_state())
+
+    def get_file_mtime(self):
+        """Returns the modification time of the tracker file, or None if it does not exist."""
+        try:
+            return os.path.getmtime(self.filename)
+        except (OSError, TypeError):
+            return None
+
+    def reload_if_changed(self):
+        """
+        Reloads the tracker file if another process modified it since it was last loaded or saved.
+        Listeners on the event bus receive the differences as change events. A file that cannot
+        be read as a complete tracker state (e.g. one that is still being written) is skipped.
+
+        Returns:
+            bool: True if the file was reloaded.
+        """
+        mtime = self.get_file_mtime()
+        if mtime is None or mtime == self._file_mtime:
+            return False
+        try:
+            with open(self.filename, 'r') as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return False  # Probably still being written; keep the current state and retry on the next poll
+        if not isinstance(data, dict) or any(key not in data for key in self.get_default_data()):
+            return False
+        self.load_state(data)
+        self._file_mtime = mtime
+        if self.history is not None:
+            self.history.rebase(self.get_state())
+        return True
+
+    @synchronized
+    def load_state(self, data):
+        """
+        Restores the tracker state from a dictionary in the same format as the JSON file.
+
+        Args:
+            data (dict): The state to restore.
+        """
+        previous = self.get_state() if self.event_bus is not None else None
+        self._search_index = None
+        self.total_xp = data['total_xp']
+        self.rewards = [dict(reward) for reward in data['rewards']]
+        self.level = data['level']
+        self.current_hp = data['current_hp']
+        self.coins = data['coins']
+        self.exp_needed = data['exp_needed']
+        self.habits = [
+            Habit.from_dict(habit_data)
+            for habit_data in data['habits']
+        ]
+        if self.history_store is not None:
+            for habit in self.habits:
+                self.history_store.attach(habit)
+        if self._snapshot is not None:
+            self._draft = StateSnapshot.from_tracker(self, self._snapshot.version + 1)
+        if previous is not None:
+            self.publish_differences(previous, self.get_state())
+
+    def get_state(self):
+        """
+        Returns the current state of the tracker as a JSON-serializable dictionary.
+
+        Returns:
+            dict: The state in the same format used by save_to_json.
         """
-        data_to_save = {
+        return {
             'habits': [habit.to_dict() for habit in self.habits],
             'total_xp': self.total_xp,
-            'rewards': self.rewards,
+            'rewards': [dict(reward) for reward in self.rewards],
             'level': self.level,
             'current_hp': self.current_hp,
             'coins': self.coins,
             'exp_needed': self.exp_needed
         }
-        self.save_data(data_to_save, filename)
 
+    def publish(self, kind, key=None, data=None):
+        """
+        Publishes a change event on the event bus, if one is attached.
+
+        Args:
+            kind (str): The event kind (see events.py).
+            key (str, optional): The name of the habit or reward that changed.
+            data (dict, optional): The new state of the item.
+        """
+        if self._snapshot is not None:
+            self._draft = (self._draft or self._snapshot).with_change(kind, key, self)
+            if not self._write_depth:
+                self.commit_snapshot()
+        if self.event_bus is not None:
+            self.event_bus.publish(events.ChangeEvent(kind, key, data))
+
+    def publish_habit(self, kind, habit):
+        """
+        Publishes a change to a habit. Listeners get the fields of its row (see Habit.to_row()),
+        which are only built when an event bus is attached.
+
+        Args:
+            kind (str): The event kind (see events.py).
+            habit (Habit): The habit that changed.
+        """
+        self.publish(kind, habit.name, habit.to_row() if self.event_bus is not None else None)
+
+    @contextlib.contextmanager
+    def writing(self):
+        """
+        Groups changes into one write. Writers from other threads wait for it to finish;
+        readers are never blocked and see all of its changes at once when it ends.
+        """
+        with self.write_lock:
+            self._write_depth += 1
+            try:
+                yield self
+            finally:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self.commit_snapshot()
+                    if self._save_pending:
+                        self._save_pending = False
+                        self.save_to_json()
+
+    def commit_snapshot(self):
+        """Makes the snapshot built by the current write visible to readers."""
+        if self._draft is not None:
+            self._snapshot, self._draft = self._draft, None
+
+    def snapshot(self):
+        """
+        Returns an immutable, consistent view of the current state, for long reads such as
+        statistics and exports. Getting it is O(1); later writes do not change it.
+
+        Returns:
+            StateSnapshot: The latest committed state.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self.write_lock:
+                if self._snapshot is None:
+                    self._snapshot = StateSnapshot.from_tracker(self)
+                snapshot = self._snapshot
+        return snapshot
+
+    def publish_progress(self):
+        """Publishes the current XP, level, HP and coins."""
+        self.publish(events.PROGRESS_CHANGED, data=self.get_progress())
+
+    def get_progress(self):
+        """
+        Returns the progress values shown in the status bar.
+
+        Returns:
+            dict: The level, XP, XP needed, HP and coins.
+        """
+        return {
+            'level': self.level,
+            'total_xp': self.total_xp,
+            'exp_needed': self.exp_needed,
+            'current_hp': self.current_hp,
+            'coins': self.coins
+        }
+
+    def publish_differences(self, old_state, new_state):
+        """
+        Publishes the events that turn one state into another, e.g. after reloading the file.
+
+        Args:
+            old_state (dict): The state before the change.
+            new_state (dict): The state after the change.
+        """
+        kinds = {
+            'habits': (events.HABIT_ADDED, events.HABIT_UPDATED, events.HABIT_REMOVED),
+            'rewards': (events.REWARD_ADDED, events.REWARD_UPDATED, events.REWARD_REMOVED)
+        }
+        row_fields = ('name', 'periodicity', 'streak', 'last_completed')  # Habit.to_row(), without the history
+        for collection, (added, updated, removed) in kinds.items():
+            old_items = {item['name']: item for item in old_state[collection]}
+            new_items = {item['name']: item for item in new_state[collection]}
+            for name in old_items:
+                if name not in new_items:
+                    self.publish(removed, name)
+            for name, item in new_items.items():
+                if collection == 'habits':
+                    data = {key: item[key] for key in row_fields}
+                else:
+                    data = item
+                if name not in old_items:
+                    self.publish(added, name, data)
+                elif item != old_items[name]:
+                    self.publish(updated, name, data)
+        if any(old_state[key] != new_state[key] for key in self.get_progress()):
+            self.publish_progress()
+
+    def record_event(self, op, at, **args):
+        """
+        Records an operation in the history log, if one is attached.
+
+        Args:
+            op (str): The operation name (e.g. 'complete', 'add_habit').
+            at (datetime): When the operation happened.
+            **args: The operation arguments needed to replay it.
+        """
+        if self.history is not None:
+            self.history.record(op, at, **args)
+
+    @synchronized
     def add_habit(self, name, habit_type):
         """
         Adds a new habit to the tracker if it does not already exist.
@@ -120,11 +392,18 @@ class HabitTracker:
             print("Error: A habit with that name already exists.")
             return
 
-        new_habit = Habit(name, habit_type)
-        self.habits.append(new_habit)
+        if self.replica is not None:
+            self.replica.add_habit(name, habit_type)
+        else:
+            new_habit = Habit(name, habit_type)
+            self.habits.append(new_habit)
+            self.update_search_index('habit', name, new_habit)
+            self.publish_habit(events.HABIT_ADDED, new_habit)
+        self.record_event('add_habit', self.clock(), name=name, periodicity=habit_type)
         self.save_to_json()
         print("Habit created successfully!")  # Move the success message here
 
+    @synchronized
     def delete_habit(self, name):
         """
         Deletes a habit by its name after user confirmation.
@@ -137,12 +416,21 @@ class HabitTracker:
         """
         confirm = input(f"Are you sure you want to delete the habit '{name}'? (yes/no): ").strip().lower()
         if confirm == 'yes':
-            self.habits = [habit for habit in self.habits if habit.name != name]
+            if self.replica is not None:
+                self.replica.remove_habit(name)
+            else:
+                self.habits = [habit for habit in self.habits if habit.name != name]
+                if self.history_store is not None:
+                    self.history_store.drop(name)
+                self.update_search_index('habit', name)
+                self.publish(events.HABIT_REMOVED, name)
+            self.record_event('delete_habit', self.clock(), name=name)
             self.save_to_json()
             print(f"Habit '{name}' deleted successfully!")
         else:
             print("Habit deletion canceled.")
 
+    @synchronized
     def mark_habit(self, name):
         """
         Marks a specified habit as complete, updates XP and coin counts, and checks for level up.
@@ -151,21 +439,75 @@ class HabitTracker:
             name (str): The name of the habit to mark as complete.
 
         Returns:
-            None
+            tuple: (bool, str) indicating (was_completed, message)
         """
-        now = datetime.now()  # Store now once
+        now = self.clock()  # Store now once
         for habit in self.habits:
             if habit.name == name:
-                habit.mark_complete(now)
-                xp_gained = habit.calculate_xp()
-                self.total_xp += xp_gained
-                self.coins += 10  # Example coin gain
-                print(f'You gained {xp_gained} XP and 10 coins!')
-                self.check_level_up()
+                if self.replica is not None:
+                    completed, message, xp_gained = self.replica.complete(name, now)
+                else:
+                    completed, message, xp_gained = self.apply_completion(habit, now)
+                if completed:
+                    print(f'You gained {xp_gained} XP and {self.coins_per_completion} coins!')
+                    self.record_event('complete', now, name=name)
+                else:
+                    print(message)
                 break
         else:
-            print("Habit not found!")
+            completed, message = False, "Habit not found!"
+            print(message)
         self.save_to_json()
+        return completed, message
+
+    def apply_completion(self, habit, completed_at):
+        """
+        Completes a habit and applies the XP, coin and level-up rules, without saving.
+
+        Args:
+            habit (Habit): The habit being completed.
+            completed_at (datetime): The timestamp of the completion.
+
+        Returns:
+            tuple: (bool, str, int) as returned by Habit.mark_complete.
+        """
+        completed, message, xp_gained = habit.mark_complete(completed_at)
+        if completed:
+            self.total_xp += xp_gained
+            self.coins += self.coins_per_completion  # Example coin gain
+            self.check_level_up()
+            if self.history_store is not None:
+                self.history_store.spill(habit)
+            self.publish_habit(events.HABIT_UPDATED, habit)
+            self.publish_progress()
+        return completed, message, xp_gained
+
+    @synchronized
+    def undo(self, count=1):
+        """
+        Undoes the last operations recorded in the history, on both the history and the tracker.
+
+        Args:
+            count (int, optional): Number of operations to undo. Defaults to 1.
+
+        Returns:
+            bool: True if the operations were undone, False if the tracker has no history.
+        """
+        if self.history is None:
+            print("Error: There is no history to undo.")
+            return False
+        count = min(count, len(self.history.events))
+        restored = self.history.undo(count)
+        if self.history_store is not None:
+            # Undone completions may already have been spilled to cold segments
+            kept = {habit.name: habit.last_completed_date for habit in restored.habits}
+            for habit in self.habits:
+                last = kept.get(habit.name)
+                self.history_store.truncate(habit.name, last.date() if last else None)
+        self.load_state(restored.get_state())
+        self.save_to_json()
+        print(f"Undid the last {count} operation(s).")
+        return True
 
     def check_level_up(self):
         """
@@ -184,37 +526,46 @@ class HabitTracker:
     def view_statistics(self):
         """
         Displays the statistics of the habits, including total XP, level, longest streak, average streak length, and success rate.
+        Reads from a snapshot, so completions made meanwhile are neither blocked nor half-counted.
 
         Returns:
-            None
+            str: The statistics text that was printed.
         """
-        print("\n--- Statistics ---")
-        if not self.habits:
-            print("No habits to show statistics for.")
-            return
+        state = self.snapshot()
+        if not state.habits:
+            text = "No habits to show statistics for."
+            print("\n--- Statistics ---")
+            print(text)
+            return text
 
         longest_streak = 0
         total_streak = 0
         completed_count = 0
 
-        for habit in self.habits:
-            total_streak += habit.streak
-            longest_streak = max(longest_streak, habit.streak)
-            if habit.last_completed:
+        for habit in state.habits:
+            total_streak += habit.current_streak
+            longest_streak = max(longest_streak, habit.current_streak)
+            if habit.last_completed_date:
                 completed_count += 1
 
-        average_streak_length = total_streak / len(self.habits) if self.habits else 0
-        success_rate = (completed_count / len(self.habits)) * 100 if self.habits else 0
-
-        print(f"Total XP: {self.total_xp} / {self.exp_needed} needed for next level")
-        print(f"Level: {self.level}")
-        print(f"Longest Streak: {longest_streak}")
-        print(f"Average Streak Length: {average_streak_length:.2f}")
-        print(f"Success Rate: {success_rate:.2f}%")
-        print(f"Current HP: {self.current_hp}")
-        print(f"Coins: {self.coins}")
+        average_streak_length = total_streak / len(state.habits) if state.habits else 0
+        success_rate = (completed_count / len(state.habits)) * 100 if state.habits else 0
+
+        lines = [
+            f"Total XP: {state.total_xp} / {state.exp_needed} needed for next level",
+            f"Level: {state.level}",
+            f"Longest Streak: {longest_streak}",
+            f"Average Streak Length: {average_streak_length:.2f}",
+            f"Success Rate: {success_rate:.2f}%",
+            f"Current HP: {state.current_hp}",
+            f"Coins: {state.coins}"
+        ]
+        print("\n--- Statistics ---")
+        print("\n".join(lines))
         print("------------------")
+        return "\n".join(lines)
 
+    @synchronized
     def create_reward(self, name, difficulty):
         """
         Creates a new reward if it does not already exist.
@@ -230,14 +581,21 @@ class HabitTracker:
             print("Error: A reward with that name already exists.")
             return
 
-        reward = {
-            'name': name,
-            'difficulty': difficulty,
-            'last_exchanged': None  # Initialize the last exchanged time as None
-        }
-        self.rewards.append(reward)
+        if self.replica is not None:
+            self.replica.create_reward(name, difficulty)
+        else:
+            reward = {
+                'name': name,
+                'difficulty': difficulty,
+                'last_exchanged': None  # Initialize the last exchanged time as None
+            }
+            self.rewards.append(reward)
+            self.update_search_index('reward', name, reward)
+            self.publish(events.REWARD_ADDED, name, dict(reward))
+        self.record_event('create_reward', self.clock(), name=name, difficulty=difficulty)
         self.save_to_json()
 
+    @synchronized
     def delete_reward(self, name):
         """
         Deletes a reward from the list of rewards based on its name.
@@ -245,9 +603,16 @@ class HabitTracker:
         Args:
             name (str): The name of the reward to be deleted.
         """
-        self.rewards = [reward for reward in self.rewards if reward['name'] != name]
+        if self.replica is not None:
+            self.replica.delete_reward(name)
+        else:
+            self.rewards = [reward for reward in self.rewards if reward['name'] != name]
+            self.update_search_index('reward', name)
+            self.publish(events.REWARD_REMOVED, name)
+        self.record_event('delete_reward', self.clock(), name=name)
         self.save_to_json()
 
+    @synchronized
     def exchange_reward(self, name):
         """
         Exchanges a reward if enough coins are available.
@@ -258,13 +623,16 @@ class HabitTracker:
         Returns:
             None
         """
+        now = self.clock()
         for reward in self.rewards:
             if reward['name'] == name:
                 cost = self.reward_costs.get(reward['difficulty'], 0)
-                if self.total_xp >= cost:
-                    self.total_xp -= cost
-                    reward['last_exchanged'] = datetime.now().strftime(
-                        '%Y-%m-%d %H:%M:%S')  # Update the last exchanged time
+                if self.replica is not None:
+                    exchanged = self.replica.exchange_reward(name, now)
+                else:
+                    exchanged = self.apply_exchange(reward, now)
+                if exchanged:
+                    self.record_event('exchange_reward', now, name=name)
                     print(f'You exchanged {cost} XP for {name}!')
                 else:
                     print("Not enough XP to exchange for this reward.")
@@ -273,6 +641,26 @@ class HabitTracker:
             print("Reward not found!")
         self.save_to_json()
 
+    def apply_exchange(self, reward, exchanged_at):
+        """
+        Spends XP on a reward if enough is available, without saving.
+
+        Args:
+            reward (dict): The reward being exchanged.
+            exchanged_at (datetime): The timestamp of the exchange.
+
+        Returns:
+            bool: True if the reward was exchanged, False if there was not enough XP.
+        """
+        cost = self.reward_costs.get(reward['difficulty'], 0)
+        if self.total_xp < cost:
+            return False
+        self.total_xp -= cost
+        reward['last_exchanged'] = exchanged_at.strftime('%Y-%m-%d %H:%M:%S')  # Update the last exchanged time
+        self.publish(events.REWARD_EXCHANGED, reward['name'], dict(reward))
+        self.publish_progress()
+        return True
+
     def view_rewards(self):
         """
         Displays the list of rewards to the user.
@@ -351,7 +739,8 @@ class HabitTracker:
                 name = input("Enter habit name to mark as complete: ")
                 self.mark_habit(name)
             elif choice == '4' or choice == 'view':
-                self.view_habits()  # New method to view habits
+                query = input("Search habits (leave empty to show all): ").strip()
+                self.view_habits(query)  # New method to view habits
             elif choice == '5' or choice == 'back':
                 break
             else:
@@ -379,23 +768,28 @@ class HabitTracker:
             print("Invalid option, defaulting to daily.")
             return 'daily'
 
-    def view_habits(self):
+    def view_habits(self, query=''):
         """
         Displays the list of habits to the user.
 
+        Args:
+            query (str, optional): Only show habits matching this text, best matches first.
+                                   Defaults to showing every habit.
+
         Returns:
             None
         """
-        if not self.habits:
+        habits = self.search_habits(query, limit=None) if query else self.habits
+        if not habits:
             print("No habits available.")
             return
 
         print("--- Your Habits ---")
-        for habit in self.habits:
-            last_completed_str = habit.last_completed.strftime(
-                '%Y-%m-%d') if habit.last_completed else "Not completed yet"
+        for habit in habits:
+            last_completed_str = habit.last_completed_date.strftime(
+                '%Y-%m-%d') if habit.last_completed_date else "Not completed yet"
             print(
-                f"Habit: {habit.name}, Type: {habit.habit_type}, Streak: {habit.streak}, Last Completed: {last_completed_str}")
+                f"Habit: {habit.name}, Type: {habit.periodicity}, Streak: {habit.current_streak}, Last Completed: {last_completed_str}")
         print("------------------")
 
     def rewards_management(self):
@@ -445,6 +839,85 @@ class HabitTracker:
         """
         return self.habits
 
+    def get_completion_history(self, habit, start=None, end=None):
+        """
+        Returns every completion date of a habit, including history moved to cold storage.
+
+        Args:
+            habit (Habit): The habit to read.
+            start (date, optional): First date to include.
+            end (date, optional): Last date to include.
+
+        Returns:
+            list: The completion dates, oldest first.
+        """
+        if self.history_store is not None:
+            return list(self.history_store.iter_history(habit, start, end))
+        return [
+            day for day in habit.completion_dates
+            if (start is None or day >= start) and (end is None or day <= end)
+        ]
+
+    def get_search_index(self):
+        """
+        Returns the name index over habits and rewards, building it on first use.
+        """
+        if self._search_index is None:
+            self._search_index = SearchIndex()
+            for habit in self.habits:
+                self._search_index.add('habit', habit.name, habit)
+            for reward in self.rewards:
+                self._search_index.add('reward', reward['name'], reward)
+        return self._search_index
+
+    def update_search_index(self, kind, name, item=None):
+        """
+        Keeps the search index in step with a change, if the index has been built.
+
+        Args:
+            kind (str): 'habit' or 'reward'.
+            name (str): The name of the item that changed.
+            item (object, optional): The new Habit or reward dict, or None if it was removed.
+        """
+        if self._search_index is None:
+            return
+        if item is None:
+            self._search_index.remove(kind, name)
+        else:
+            self._search_index.add(kind, name, item)
+
+    def search_habits(self, query, periodicity=None, min_streak=None, limit=20):
+        """
+        Finds habits by name using prefix, substring and fuzzy matching.
+
+        Args:
+            query (str): The text to search for.
+            periodicity (str, optional): Only return habits with this periodicity.
+            min_streak (int, optional): Only return habits with at least this current streak.
+            limit (int, optional): Maximum number of results. Defaults to 20; None for all.
+
+        Returns:
+            list: The matching Habit objects, best matches first.
+        """
+        results = self.get_search_index().search(query, kind='habit', periodicity=periodicity,
+                                                 min_streak=min_streak, limit=limit)
+        return [habit for _, _, habit in results]
+
+    def search_rewards(self, query, limit=20):
+        """
+        Finds rewards by name using prefix, substring and fuzzy matching.
+
+        Returns:
+            list: The matching reward dictionaries, best matches first.
+        """
+        return [reward for _, _, reward in self.get_search_index().search(query, kind='reward', limit=limit)]
+
+    def get_habit_by_name(self, name):
+        """
+        Returns the habit with the given name, or None if there is none.
+        """
+        return next((habit for habit in self.habits if habit.name == name), None)
+
     def get_level_and_exp(self):
         """
         Returns the current level, current XP, and XP needed for the next level.
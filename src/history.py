@@ -0,0 +1,321 @@
+import bisect
+import contextlib
+import copy
+import io
+import json
+import os
+from datetime import datetime, timedelta
+from habit import Habit
+from habit_tracker import HabitTracker
+
+
+class HabitHistory:
+    # Keeps an append-only log of tracker operations plus periodic state checkpoints,
+    # so the state at any past moment can be rebuilt by replaying only a short tail.
+
+    def __init__(self, initial_state=None, checkpoint_every=100, checkpoint_days=7):
+        """
+        Initializes the history with a base checkpoint.
+
+        Args:
+            initial_state (dict, optional): The tracker state the log starts from, as returned
+                                            by HabitTracker.get_state(). Defaults to an empty tracker.
+            checkpoint_every (int, optional): Take a checkpoint after this many events. Defaults to 100.
+            checkpoint_days (int, optional): Take a checkpoint when this many days have passed since
+                                             the last one. Defaults to 7.
+        """
+        if initial_state is None:
+            initial_state = HabitTracker(filename=None).get_state()
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = timedelta(days=checkpoint_days)
+        self.events = []
+        self.times = []  # When each event happened, kept alongside the events for bisecting
+        # Each checkpoint is (event_index, timestamp, state): the state after the first event_index events
+        self.checkpoints = [(0, datetime.min, copy.deepcopy(initial_state))]
+        self._replica = None  # Tracker kept in sync with the log, used to take checkpoints
+        self._saved = None  # (events, checkpoints) already in the history file, None if it must be rewritten
+
+    def record(self, op, at, **args):
+        """
+        Appends an operation to the log and takes a checkpoint if one is due.
+
+        Args:
+            op (str): The operation name ('add_habit', 'delete_habit', 'complete',
+                      'create_reward', 'delete_reward' or 'exchange_reward').
+            at (datetime): When the operation happened. Events must be recorded in time order.
+            **args: The operation arguments needed to replay it.
+        """
+        if self.events and at < self.events[-1]['at']:
+            raise ValueError("Events must be recorded in chronological order.")
+        event = {'op': op, 'at': at, 'args': args}
+        self.events.append(event)
+        self.times.append(at)
+
+        if self._replica is None:
+            self._replica = self._restore(len(self.events) - 1)
+        self.apply_event(self._replica, event)
+
+        last_index, last_at, _ = self.checkpoints[-1]
+        if last_index == 0:
+            last_at = self.events[0]['at']  # The base checkpoint has no meaningful timestamp
+        if (len(self.events) - last_index >= self.checkpoint_every
+                or at - last_at >= self.checkpoint_interval):
+            self.checkpoints.append((len(self.events), at, self._compact(self._replica)))
+
+    def rebase(self, state):
+        """
+        Makes the log continue from the given tracker state, e.g. the tracker file that was just loaded.
+
+        An empty log starts from the state. If the log ends at a different state (the file was changed
+        by something that does not record history), a checkpoint of the state is added so later events
+        are replayed on top of it. Nothing changes if the log already ends at the state.
+
+        Args:
+            state (dict): The tracker state, as returned by HabitTracker.get_state().
+        """
+        if not self.events:
+            self.checkpoints = [(0, datetime.min, copy.deepcopy(state))]
+            self._saved = None
+        else:
+            if self._replica is None:
+                self._replica = self._restore(len(self.events))
+            if self._summary(self._replica.get_state()) == self._summary(state):
+                return
+            self.checkpoints.append((len(self.events), self.events[-1]['at'], copy.deepcopy(state)))
+        self._replica = None
+
+    @staticmethod
+    def _summary(state):
+        # Everything but the completion dates, which the tracker may keep partly in cold storage
+        habits = [{key: value for key, value in habit.items() if key != 'completion_dates'}
+                  for habit in state['habits']]
+        return dict(state, habits=habits)
+
+    def _compact(self, tracker):
+        # Serializes only the completion dates added since the previous checkpoint, so checkpoints
+        # grow with the number of completions instead of copying every habit's full history each time.
+        last_index, _, last_state = self.checkpoints[-1]
+        previous = {habit['name']: habit for habit in last_state['habits']}
+        # A habit deleted or re-added since then starts a new list of completion dates
+        restarted = {event['args']['name'] for event in self.events[last_index:]
+                     if event['op'] in ('add_habit', 'delete_habit')}
+        habits = []
+        for habit in tracker.habits:
+            earlier = previous.get(habit.name)
+            if earlier is not None and habit.name not in restarted:
+                inherited = earlier.get('inherited_completions', 0) + len(earlier['completion_dates'])
+                habits.append(dict(habit.to_dict(since=inherited), inherited_completions=inherited))
+            else:
+                habits.append(habit.to_dict())
+        return dict(tracker.get_progress(), habits=habits, rewards=[dict(reward) for reward in tracker.rewards])
+
+    def _checkpoint_state(self, position):
+        # Rebuilds the full state of a checkpoint by joining each habit's completion dates with
+        # the ones it inherited from earlier checkpoints
+        state = self.checkpoints[position][2]
+        habits = [dict(habit) for habit in state['habits']]
+        pending = {habit['name']: habit for habit in habits if habit.pop('inherited_completions', 0)}
+        chunks = {name: [habit['completion_dates']] for name, habit in pending.items()}
+        while pending:
+            position -= 1
+            earlier = {habit['name']: habit for habit in self.checkpoints[position][2]['habits']}
+            for name in list(pending):
+                chunks[name].append(earlier[name]['completion_dates'])
+                if not earlier[name].get('inherited_completions'):
+                    del pending[name]
+        for habit in habits:
+            if habit['name'] in chunks:
+                habit['completion_dates'] = [day for chunk in reversed(chunks[habit['name']]) for day in chunk]
+        return dict(state, habits=habits)
+
+    @staticmethod
+    def apply_event(tracker, event):
+        """
+        Applies a single logged event to a tracker without saving or recording it.
+
+        Args:
+            tracker (HabitTracker): The tracker to update.
+            event (dict): The event to apply.
+        """
+        op, at, args = event['op'], event['at'], event['args']
+        # Replaying uses the same rules as the live tracker, so silence its messages
+        with contextlib.redirect_stdout(io.StringIO()):
+            if op == 'add_habit':
+                tracker.habits.append(Habit(args['name'], args['periodicity']))
+            elif op == 'delete_habit':
+                tracker.habits = [habit for habit in tracker.habits if habit.name != args['name']]
+            elif op == 'complete':
+                for habit in tracker.habits:
+                    if habit.name == args['name']:
+                        tracker.apply_completion(habit, at)
+                        break
+            elif op == 'create_reward':
+                tracker.rewards.append({
+                    'name': args['name'],
+                    'difficulty': args['difficulty'],
+                    'last_exchanged': None
+                })
+            elif op == 'delete_reward':
+                tracker.rewards = [reward for reward in tracker.rewards if reward['name'] != args['name']]
+            elif op == 'exchange_reward':
+                for reward in tracker.rewards:
+                    if reward['name'] == args['name']:
+                        tracker.apply_exchange(reward, at)
+                        break
+            else:
+                raise ValueError(f"Unknown history operation '{op}'.")
+
+    def _restore(self, event_index):
+        """
+        Rebuilds the tracker state after the first event_index events.
+
+        Args:
+            event_index (int): Number of events to include.
+
+        Returns:
+            HabitTracker: A detached tracker holding the reconstructed state.
+        """
+        # Nearest checkpoint at or before the requested position
+        positions = [index for index, _, _ in self.checkpoints]
+        position = bisect.bisect_right(positions, event_index) - 1
+        start = positions[position]
+
+        tracker = HabitTracker(filename=None)
+        tracker.load_state(self._checkpoint_state(position))
+        for event in self.events[start:event_index]:
+            self.apply_event(tracker, event)
+        return tracker
+
+    def as_of(self, timestamp):
+        """
+        Reconstructs the tracker as it was at the given moment.
+
+        Args:
+            timestamp (datetime): The point in time to reconstruct.
+
+        Returns:
+            HabitTracker: A detached tracker (not linked to a file or this history) with the
+                          state after every event that happened at or before the timestamp.
+        """
+        return self._restore(bisect.bisect_right(self.times, timestamp))
+
+    def undo(self, count=1):
+        """
+        Drops the last operations from the log and returns the state before them.
+        Only the log changes; use HabitTracker.undo() to undo on the tracker the history is attached to.
+
+        Args:
+            count (int, optional): Number of operations to undo. Defaults to 1.
+
+        Returns:
+            HabitTracker: A detached tracker with the state before the undone operations.
+        """
+        keep = max(len(self.events) - count, 0)
+        del self.events[keep:]
+        del self.times[keep:]
+        self._saved = None  # The file still holds the undone events
+        self.checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint[0] <= keep]
+        self._replica = self._restore(keep)
+        tracker = HabitTracker(filename=None)
+        tracker.load_state(self._replica.get_state())
+        return tracker
+
+    def to_dict(self):
+        """Converts the history to a dictionary for JSON serialization."""
+        return {
+            'checkpoint_every': self.checkpoint_every,
+            'checkpoint_days': self.checkpoint_interval.days,
+            'events': [
+                {'op': event['op'], 'at': event['at'].isoformat(), 'args': event['args']}
+                for event in self.events
+            ],
+            'checkpoints': [
+                {'index': index, 'at': at.isoformat(), 'state': state}
+                for index, at, state in self.checkpoints
+            ]
+        }
+
+    def load(self, data):
+        """
+        Replaces the log and checkpoints with the ones in a dictionary returned by to_dict().
+
+        Args:
+            data (dict): The saved history.
+        """
+        self.checkpoint_every = data.get('checkpoint_every', 100)
+        self.checkpoint_interval = timedelta(days=data.get('checkpoint_days', 7))
+        self.checkpoints = [
+            (item['index'], datetime.fromisoformat(item['at']), item['state'])
+            for item in data['checkpoints']
+        ]
+        self.events = [
+            {'op': item['op'], 'at': datetime.fromisoformat(item['at']), 'args': item['args']}
+            for item in data['events']
+        ]
+        self.times = [event['at'] for event in self.events]
+        self._replica = None
+        self._saved = None
+
+    def save(self, filename):
+        """
+        Saves the history as an NDJSON file with one event or checkpoint per line. Only the records
+        added since the last save or load are appended; the file is rewritten after an undo.
+
+        Args:
+            filename (str): The history file.
+        """
+        if self._saved is None:
+            temp_path = filename + '.tmp'
+            with open(temp_path, 'w') as file:
+                self._write_records(file, 0, 0)
+            os.replace(temp_path, filename)
+        else:
+            with open(filename, 'a') as file:
+                self._write_records(file, *self._saved)
+        self._saved = (len(self.events), len(self.checkpoints))
+
+    def _write_records(self, file, first_event, first_checkpoint):
+        for index, at, state in self.checkpoints[first_checkpoint:]:
+            file.write(json.dumps({'checkpoint': {'index': index, 'at': at.isoformat(), 'state': state}}) + '\n')
+        for event in self.events[first_event:]:
+            record = {'op': event['op'], 'at': event['at'].isoformat(), 'args': event['args']}
+            file.write(json.dumps({'event': record}) + '\n')
+
+    def load_file(self, filename):
+        """
+        Replaces the log and checkpoints with the ones saved by save(). A last line cut short
+        by an interrupted write is dropped.
+
+        Args:
+            filename (str): The history file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        events, checkpoints = [], []
+        with open(filename, 'rb+') as file:
+            position = 0
+            for line in file:
+                if not line.endswith(b'\n'):
+                    file.truncate(position)
+                    break
+                position += len(line)
+                record = json.loads(line)
+                if 'event' in record:
+                    item = record['event']
+                    events.append({'op': item['op'], 'at': datetime.fromisoformat(item['at']), 'args': item['args']})
+                else:
+                    item = record['checkpoint']
+                    checkpoints.append((item['index'], datetime.fromisoformat(item['at']), item['state']))
+        if checkpoints:
+            self.events, self.checkpoints = events, checkpoints
+            self.times = [event['at'] for event in events]
+            self._replica = None
+            self._saved = (len(self.events), len(self.checkpoints))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a HabitHistory object from a dictionary (e.g., loaded from JSON)."""
+        history = cls(data['checkpoints'][0]['state'])
+        history.load(data)
+        return history
@@ -0,0 +1,256 @@
+import gzip
+import json
+import lzma
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+
+class TieredHistoryStore:
+    # Keeps only the most recent completion dates of each habit in memory and moves
+    # older history into compressed segment files that are read back only when needed.
+    # Readers (e.g. exports from snapshots) may use it while a writer spills new segments.
+
+    compressors = {
+        'lzma': (lzma, '.xz'),
+        'gzip': (gzip, '.gz')
+    }
+
+    def __init__(self, directory, hot_size=64, segment_size=512, memory_budget=20000, compression='lzma'):
+        """
+        Initializes the store and loads the segment index from the directory, if any.
+
+        Args:
+            directory (str): Folder holding the cold segment files and their index.
+            hot_size (int, optional): Minimum number of recent completions kept on each Habit. Defaults to 64.
+            segment_size (int, optional): Number of completions written per cold segment. Defaults to 512.
+            memory_budget (int, optional): Maximum number of decompressed dates kept in the
+                                           segment cache before the least recently used
+                                           segments are evicted. Defaults to 20000.
+            compression (str, optional): 'lzma' or 'gzip'. Defaults to 'lzma'.
+        """
+        if compression not in self.compressors:
+            raise ValueError(f"Unsupported compression '{compression}'. Use 'lzma' or 'gzip'.")
+        self.directory = directory
+        self.hot_size = hot_size
+        self.segment_size = segment_size
+        self.memory_budget = memory_budget
+        self.compression = compression
+        self.segments = {}  # habit name -> list of segment metadata, oldest first
+        self.next_segment = 0
+        self._cache = OrderedDict()  # segment file -> list of dates, most recently used last
+        self._cached_dates = 0
+        self._lock = threading.RLock()  # Guards the segment index and the cache
+        os.makedirs(directory, exist_ok=True)
+        self.load_index()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    def load_index(self):
+        """Loads the segment index written by save_index, if it exists."""
+        try:
+            with open(self.index_path, 'r') as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.segments = data['segments']
+        self.next_segment = data['next_segment']
+
+    def save_index(self):
+        """Writes the segment index so the cold history survives restarts."""
+        temp_path = self.index_path + '.tmp'
+        with self._lock, open(temp_path, 'w') as file:
+            json.dump({'segments': self.segments, 'next_segment': self.next_segment}, file)
+        os.replace(temp_path, self.index_path)
+
+    def attach(self, habit):
+        """
+        Moves the older completion dates of a habit into cold segments.
+
+        Dates that are already covered by existing segments (e.g. because the habit was saved
+        with its full history) are dropped from memory instead of being written again.
+
+        Args:
+            habit (Habit): The habit whose completion_dates should be trimmed.
+        """
+        segments = self.get_segments(habit.name)
+        if segments:
+            last_cold = date.fromisoformat(segments[-1]['last'])
+            habit.completion_dates = [day for day in habit.completion_dates if day > last_cold]
+        self.spill(habit)
+
+    def get_segments(self, name):
+        """
+        Returns the metadata of a habit's cold segments as they are now, oldest first.
+        Later spills do not change the returned tuple, so it can be kept in a snapshot.
+
+        Args:
+            name (str): The name of the habit.
+
+        Returns:
+            tuple: One dictionary per segment, with its file, first and last date and count.
+        """
+        with self._lock:
+            return tuple(self.segments.get(name, ()))
+
+    def spill(self, habit):
+        """
+        Writes full segments of the oldest hot completions to disk once the hot window overflows.
+
+        Args:
+            habit (Habit): The habit to trim.
+        """
+        written = False
+        while len(habit.completion_dates) >= self.hot_size + self.segment_size:
+            chunk = habit.completion_dates[:self.segment_size]
+            with self._lock:
+                self._write_segment(habit.name, chunk)
+            # A new list rather than trimming in place, since snapshots may share the old one
+            habit.completion_dates = habit.completion_dates[self.segment_size:]
+            written = True
+        if written:
+            self.save_index()
+
+    def drop(self, name):
+        """
+        Removes all cold segments of a habit.
+
+        Args:
+            name (str): The name of the habit.
+        """
+        with self._lock:
+            segments = self.segments.pop(name, [])
+            for segment in segments:
+                self._evict(segment['file'])
+        for segment in segments:
+            try:
+                os.remove(os.path.join(self.directory, segment['file']))
+            except FileNotFoundError:
+                pass
+        self.save_index()
+
+    def truncate(self, name, last=None):
+        """
+        Removes the cold completions of a habit after a given date, e.g. completions that were undone.
+        A segment that straddles the date is rewritten with only its earlier dates.
+
+        Args:
+            name (str): The name of the habit.
+            last (date, optional): The last completion date to keep. Defaults to None (keep nothing).
+        """
+        with self._lock:
+            segments = self.segments.get(name, [])
+            keep = 0
+            while keep < len(segments) and last is not None and date.fromisoformat(segments[keep]['last']) <= last:
+                keep += 1
+            removed = segments[keep:]
+            if not removed:
+                return
+            straddling = None
+            if last is not None and date.fromisoformat(removed[0]['first']) <= last:
+                straddling = [day for day in self._read_segment(removed[0]['file']) if day <= last]
+            self.segments[name] = segments[:keep]
+            if straddling:
+                self._write_segment(name, straddling)
+            if not self.segments[name]:
+                del self.segments[name]
+            for segment in removed:
+                self._evict(segment['file'])
+        for segment in removed:
+            try:
+                os.remove(os.path.join(self.directory, segment['file']))
+            except FileNotFoundError:
+                pass
+        self.save_index()
+
+    def iter_history(self, habit, start=None, end=None, segments=None):
+        """
+        Yields every completion date of a habit in order, paging in only the cold segments
+        that overlap the requested range.
+
+        Args:
+            habit (Habit): The habit to read.
+            start (date, optional): First date to include. Defaults to the beginning.
+            end (date, optional): Last date to include. Defaults to the most recent completion.
+            segments (tuple, optional): The cold segments to read, as returned by get_segments()
+                                        when the habit's hot dates were copied (e.g. by a snapshot).
+                                        Defaults to the current segments.
+
+        Yields:
+            date: The completion dates, oldest first.
+        """
+        if segments is None:
+            segments = self.get_segments(habit.name)
+        for segment in segments:
+            if start and date.fromisoformat(segment['last']) < start:
+                continue
+            if end and date.fromisoformat(segment['first']) > end:
+                break
+            for day in self._read_segment(segment['file']):
+                if (start is None or day >= start) and (end is None or day <= end):
+                    yield day
+        for day in list(habit.completion_dates):
+            if (start is None or day >= start) and (end is None or day <= end):
+                yield day
+
+    def count(self, habit, segments=None):
+        """
+        Returns the total number of completions of a habit without reading any segment.
+
+        Args:
+            habit (Habit): The habit to count.
+            segments (tuple, optional): The cold segments to count (see iter_history).
+                                        Defaults to the current segments.
+
+        Returns:
+            int: Cold plus hot completions.
+        """
+        if segments is None:
+            segments = self.get_segments(habit.name)
+        cold = sum(segment['count'] for segment in segments)
+        return cold + len(habit.completion_dates)
+
+    def _write_segment(self, name, days):
+        module, extension = self.compressors[self.compression]
+        filename = f"{self.next_segment:08d}{extension}"
+        self.next_segment += 1
+        payload = '\n'.join(str(day.toordinal()) for day in days).encode('ascii')
+        temp_path = os.path.join(self.directory, filename + '.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(module.compress(payload))
+        os.replace(temp_path, os.path.join(self.directory, filename))
+        self.segments.setdefault(name, []).append({
+            'file': filename,
+            'first': days[0].isoformat(),
+            'last': days[-1].isoformat(),
+            'count': len(days)
+        })
+
+    def _read_segment(self, filename):
+        with self._lock:
+            if filename in self._cache:
+                self._cache.move_to_end(filename)
+                return self._cache[filename]
+
+        # Decompress without holding the lock, so other readers are not held up
+        module = lzma if filename.endswith('.xz') else gzip
+        with open(os.path.join(self.directory, filename), 'rb') as file:
+            payload = module.decompress(file.read()).decode('ascii')
+        days = [date.fromordinal(int(line)) for line in payload.split('\n') if line]
+
+        with self._lock:
+            if filename not in self._cache:  # Another reader may have loaded it meanwhile
+                self._cache[filename] = days
+                self._cached_dates += len(days)
+            # Evict least recently used segments, but always keep the one just loaded
+            while self._cached_dates > self.memory_budget and len(self._cache) > 1:
+                self._evict(next(iter(self._cache)))
+        return days
+
+    def _evict(self, filename):
+        days = self._cache.pop(filename, None)
+        if days is not None:
+            self._cached_dates -= len(days)
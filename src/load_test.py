@@ -0,0 +1,254 @@
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from habit_tracker import HabitTracker
+
+
+class FakeClock:
+    # A clock that only moves when told to, injected into HabitTracker so a soak run
+    # can cover months of simulated time in minutes.
+
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        """Moves the clock forward by the given timedelta arguments (e.g. days=1)."""
+        self.now += timedelta(**kwargs)
+
+
+class LatencyHistogram:
+    # Thread-safe latency histogram with power-of-two microsecond buckets.
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Adds one latency sample, in seconds."""
+        bucket = 1
+        while bucket < seconds * 1_000_000:
+            bucket *= 2
+        with self._lock:
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.maximum = max(self.maximum, seconds)
+
+    def mean(self):
+        """Returns the mean latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Returns the upper bound (in seconds) of the bucket holding the given percentile."""
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return bucket / 1_000_000
+        return 0.0
+
+
+class VirtualUser:
+    # One simulated user with their own tracker file and habits of varying discipline.
+
+    def __init__(self, user_id, directory, clock, seed, habit_count=5):
+        self.rng = random.Random(seed)
+        self.tracker = HabitTracker(filename=None, clock=clock)
+        self.tracker.filename = os.path.join(directory, f'user_{user_id}.json')
+        self.plans = []
+        for index in range(habit_count):
+            periodicity = 'weekly' if self.rng.random() < 0.3 else 'daily'
+            name = f'{periodicity.title()} Habit {index}'
+            self.tracker.add_habit(name, periodicity)
+            # Each habit gets an adherence rate and, for weekly habits, a usual weekday
+            self.plans.append((name, periodicity, self.rng.uniform(0.5, 0.95), self.rng.randrange(7)))
+        for difficulty in self.tracker.reward_costs:
+            self.tracker.create_reward(f'{difficulty.title()} Treat', difficulty)
+
+    def simulate_day(self, today, stats):
+        """
+        Performs the completions and reward exchanges this user would do on one day.
+
+        Args:
+            today (date): The simulated date.
+            stats (dict): Operation name -> LatencyHistogram to record into.
+        """
+        for name, periodicity, adherence, weekday in self.plans:
+            if periodicity == 'weekly' and today.weekday() != weekday:
+                continue
+            if self.rng.random() < adherence:
+                started = time.perf_counter()
+                self.tracker.mark_habit(name)
+                stats['mark_habit'].record(time.perf_counter() - started)
+        if self.rng.random() < 0.05:
+            reward = self.rng.choice(self.tracker.rewards)['name']
+            started = time.perf_counter()
+            self.tracker.exchange_reward(reward)
+            stats['exchange_reward'].record(time.perf_counter() - started)
+
+
+def run_soak(users=10, days=90, workers=4, seed=0, directory=None, trace_memory=True, tolerance=2.0):
+    """
+    Simulates many users over months of fake time and measures how the tracker holds up.
+
+    Every simulated day, all users act concurrently on a thread pool while the clock stands still,
+    then the clock advances one day. Metrics are sampled at the end of every simulated week.
+
+    Args:
+        users (int, optional): Number of virtual users. Defaults to 10.
+        days (int, optional): Number of simulated days. Defaults to 90.
+        workers (int, optional): Number of threads running users concurrently. Defaults to 4.
+        seed (int, optional): Seed for the simulated behaviour. Defaults to 0.
+        directory (str, optional): Where user files are written. Defaults to a temporary folder
+                                   that is removed afterwards.
+        trace_memory (bool, optional): Measure Python memory with tracemalloc. Defaults to True.
+        tolerance (float, optional): How much faster than the stored data latency or memory may grow
+                                     before it is flagged. Defaults to 2.0.
+
+    Returns:
+        dict: The report with latency histograms, throughput, weekly samples and flags.
+    """
+    own_directory = directory is None
+    directory = directory or tempfile.mkdtemp(prefix='habit_soak_')
+    clock = FakeClock(datetime(2025, 1, 6, 8, 0))
+    stats = {'mark_habit': LatencyHistogram(), 'exchange_reward': LatencyHistogram()}
+    samples = []
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            population = [VirtualUser(user_id, directory, clock, seed + user_id) for user_id in range(users)]
+            started = time.perf_counter()
+            window_started = started
+            window_ops = 0
+            window_marks = (0, 0.0)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for day in range(days):
+                    today = clock().date()
+                    list(executor.map(lambda user: user.simulate_day(today, stats), population))
+                    clock.advance(days=1)
+
+                    if (day + 1) % 7 == 0 or day + 1 == days:
+                        now = time.perf_counter()
+                        ops = sum(histogram.count for histogram in stats.values())
+                        marks = stats['mark_habit']
+                        window_count = marks.count - window_marks[0]
+                        samples.append({
+                            'day': day + 1,
+                            'throughput': (ops - window_ops) / (now - window_started) if now > window_started else 0.0,
+                            'mark_mean': (marks.total - window_marks[1]) / window_count if window_count else 0.0,
+                            'completions': sum(len(habit.completion_dates)
+                                               for user in population for habit in user.tracker.habits),
+                            'file_bytes': sum(os.path.getsize(user.tracker.filename) for user in population),
+                            'memory_bytes': tracemalloc.get_traced_memory()[0] if trace_memory else None
+                        })
+                        window_started, window_ops, window_marks = now, ops, (marks.count, marks.total)
+            elapsed = time.perf_counter() - started
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        if own_directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    total_ops = sum(histogram.count for histogram in stats.values())
+    return {
+        'users': users,
+        'days': days,
+        'operations': total_ops,
+        'elapsed': elapsed,
+        'throughput': total_ops / elapsed if elapsed else 0.0,
+        'latency': stats,
+        'samples': samples,
+        'flags': find_problems(samples, tolerance)
+    }
+
+
+def find_problems(samples, tolerance=2.0):
+    """
+    Compares the first and last weekly samples to spot leaks and superlinear slowdowns.
+
+    Latency and memory are expected to grow at most in proportion to the amount of stored data;
+    anything growing more than `tolerance` times faster than that is flagged.
+
+    Args:
+        samples (list): The weekly samples from run_soak.
+        tolerance (float, optional): Allowed growth beyond the data growth. Defaults to 2.0.
+
+    Returns:
+        list: Human-readable descriptions of the problems found.
+    """
+    flags = []
+    if len(samples) < 2:
+        return flags
+    first, last = samples[0], samples[-1]
+    data_growth = last['completions'] / first['completions'] if first['completions'] else 1.0
+
+    if first['mark_mean'] and last['mark_mean']:
+        latency_growth = last['mark_mean'] / first['mark_mean']
+        if latency_growth > tolerance * max(data_growth, 1.0):
+            flags.append(f"Superlinear slowdown: mark_habit latency grew {latency_growth:.1f}x "
+                         f"while stored completions grew {data_growth:.1f}x.")
+    if first['memory_bytes'] and last['memory_bytes']:
+        memory_growth = last['memory_bytes'] / first['memory_bytes']
+        file_growth = last['file_bytes'] / first['file_bytes'] if first['file_bytes'] else 1.0
+        if memory_growth > tolerance * max(file_growth, 1.0):
+            flags.append(f"Possible leak: memory grew {memory_growth:.1f}x "
+                         f"while saved data grew {file_growth:.1f}x.")
+    return flags
+
+
+def format_report(report):
+    """
+    Formats a run_soak report for the terminal.
+
+    Args:
+        report (dict): The report returned by run_soak.
+
+    Returns:
+        str: The formatted report.
+    """
+    lines = [
+        "--- Soak Test Report ---",
+        f"Users: {report['users']}, Simulated days: {report['days']}",
+        f"Operations: {report['operations']} in {report['elapsed']:.2f}s ({report['throughput']:.0f} ops/s)",
+    ]
+    for name, histogram in report['latency'].items():
+        lines.append(f"{name}: mean {histogram.mean() * 1000:.3f}ms, p50 <= {histogram.percentile(0.5) * 1000:.3f}ms, "
+                     f"p99 <= {histogram.percentile(0.99) * 1000:.3f}ms, max {histogram.maximum * 1000:.3f}ms")
+        for bucket in sorted(histogram.buckets):
+            lines.append(f"    <= {bucket:>8}us: {histogram.buckets[bucket]}")
+    lines.append("Day  ops/s  mark(ms)  completions  file(KB)  memory(KB)")
+    for sample in report['samples']:
+        memory = f"{sample['memory_bytes'] / 1024:.0f}" if sample['memory_bytes'] is not None else '-'
+        lines.append(f"{sample['day']:>3}  {sample['throughput']:>5.0f}  {sample['mark_mean'] * 1000:>8.3f}  "
+                     f"{sample['completions']:>11}  {sample['file_bytes'] / 1024:>8.0f}  {memory:>10}")
+    lines.extend(report['flags'] or ["No leaks or superlinear slowdowns detected."])
+    lines.append("------------------------")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a load and soak test against the habit tracker")
+    parser.add_argument('--users', type=int, default=10, help='Number of virtual users')
+    parser.add_argument('--days', type=int, default=90, help='Number of simulated days')
+    parser.add_argument('--workers', type=int, default=4, help='Number of concurrent threads')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc memory tracking')
+    args = parser.parse_args()
+    print(format_report(run_soak(args.users, args.days, args.workers, args.seed, trace_memory=not args.no_memory)))
@@ -0,0 +1,283 @@
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import repeat
+from habit import Habit
+from habit_tracker import HabitTracker
+from history_store import TieredHistoryStore
+
+
+def replay_habit(task):
+    """
+    Replays the completion history of one habit with the current Habit rules.
+
+    Runs inside a worker process, so it only receives and returns compact arrays.
+
+    Args:
+        task (tuple): (periodicity, ordinals) where ordinals is an array of day ordinals, oldest first,
+                      optionally followed by the streak and last completion (datetime) to continue from.
+
+    Returns:
+        tuple: (streak, ordinals, xp) where ordinals and xp are arrays describing every
+               completion that was accepted and the XP it earned.
+    """
+    periodicity, ordinals, *start = task
+    habit = Habit('', periodicity, *start)
+    accepted = array('l')
+    xp = array('l')
+    for ordinal in ordinals:
+        completed, _, xp_gained = habit.mark_complete(datetime.fromordinal(ordinal))
+        if completed:
+            accepted.append(ordinal)
+            xp.append(xp_gained)
+    return habit.current_streak, accepted, xp
+
+
+def completion_ordinals(habit_data, store=None):
+    """
+    Returns the completion days of a saved habit as sorted day ordinals, including cold history.
+
+    Args:
+        habit_data (dict): The habit as saved in the user file.
+        store (TieredHistoryStore, optional): The user's history store. Defaults to None.
+
+    Returns:
+        array: The day ordinals, oldest first. Dates that cannot be parsed are skipped.
+    """
+    ordinals = array('l')
+    for value in habit_data.get('completion_dates', []):
+        try:
+            ordinals.append(date.fromisoformat(value).toordinal())
+        except ValueError:
+            pass
+    ordinals = array('l', sorted(ordinals))
+    if store is not None:
+        name = habit_data.get('name', 'Unnamed Habit')
+        cold = array('l', (day.toordinal() for day in store.iter_history(Habit(name, 'daily'))))
+        # Hot dates also in cold storage (e.g. a file saved with its full history) are counted once
+        ordinals = cold + array('l', (ordinal for ordinal in ordinals if not cold or ordinal > cold[-1]))
+    return ordinals
+
+
+def missing_history(data, histories):
+    """
+    Explains why a user's progress cannot be rebuilt from the recorded completions, e.g. because
+    the file was saved before completion dates were recorded.
+
+    Args:
+        data (dict): The user's saved state.
+        histories (list): The completion_ordinals of each habit, in file order.
+
+    Returns:
+        str: The reason, or None if every habit has its history.
+    """
+    missing = [habit_data.get('name') for habit_data, ordinals in zip(data['habits'], histories)
+               if not ordinals and (habit_data.get('last_completed') or habit_data.get('streak'))]
+    if missing:
+        return f"no completion history for {', '.join(missing)}"
+    defaults = HabitTracker(filename=None).get_progress()
+    if not any(histories) and any(data.get(key, value) != value for key, value in defaults.items()):
+        return "progress without any completion history"
+    return None
+
+
+def merge_results(data, results):
+    """
+    Combines the per-habit results of one user into a new tracker state.
+
+    XP gains from all habits are applied in date order (habits in file order on the same day),
+    so level-ups happen exactly as they would during a serial replay.
+
+    Args:
+        data (dict): The user's saved state.
+        results (list): The replay_habit results, in the same order as data['habits'].
+
+    Returns:
+        dict: The rebuilt state, in the same format as HabitTracker.get_state().
+    """
+    tracker = HabitTracker(filename=None)
+    streams = [
+        zip(accepted, repeat(position), gains)
+        for position, (_, accepted, gains) in enumerate(results)
+    ]
+    with contextlib.redirect_stdout(io.StringIO()):  # Silence level-up messages
+        for _, _, xp in heapq.merge(*streams):
+            tracker.total_xp += xp
+            tracker.coins += tracker.coins_per_completion
+            tracker.check_level_up()
+
+    habits = []
+    for habit_data, (streak, accepted, _) in zip(data['habits'], results):
+        last_completed = habit_data.get('last_completed')
+        if not accepted:
+            last_completed = None
+        elif not last_completed or last_completed[:10] != date.fromordinal(accepted[-1]).isoformat():
+            last_completed = datetime.fromordinal(accepted[-1]).strftime('%Y-%m-%d %H:%M:%S')
+        habits.append(dict(habit_data, streak=streak, last_completed=last_completed,
+                           completion_dates=[date.fromordinal(ordinal).isoformat() for ordinal in accepted]))
+    state = tracker.get_state()
+    state.update(habits=habits, rewards=data.get('rewards', []))
+    return state
+
+
+def keep_recent(state, store):
+    """
+    Takes the completion dates that are already in cold storage out of a rebuilt state again,
+    so the user file keeps only the recent window, as the tracker saves it.
+
+    Args:
+        state (dict): The rebuilt state, with every accepted completion date.
+        store (TieredHistoryStore): The user's history store.
+
+    Returns:
+        dict: The state with only the hot completion dates.
+    """
+    habits = []
+    for habit_data in state['habits']:
+        segments = store.get_segments(habit_data['name'])
+        if segments:
+            last_cold = segments[-1]['last']  # ISO dates compare in date order
+            habit_data = dict(habit_data, completion_dates=[
+                day for day in habit_data['completion_dates'] if day > last_cold])
+        habits.append(habit_data)
+    return dict(state, habits=habits)
+
+
+def describe_changes(old, new):
+    """
+    Lists the differences between a user's saved state and the rebuilt one.
+
+    Args:
+        old (dict): The saved state.
+        new (dict): The rebuilt state.
+
+    Returns:
+        list: One message per changed progress value or habit streak.
+    """
+    changes = [f"{key} {old.get(key)} -> {new[key]}"
+               for key in ('level', 'total_xp', 'exp_needed', 'current_hp', 'coins') if old.get(key) != new[key]]
+    old_streaks = {habit_data.get('name'): habit_data.get('streak') for habit_data in old['habits']}
+    changes.extend(f"{habit_data['name']} streak {old_streaks.get(habit_data['name'])} -> {habit_data['streak']}"
+                   for habit_data in new['habits'] if old_streaks.get(habit_data['name']) != habit_data['streak'])
+    return changes
+
+
+def rebuild_user(task):
+    """
+    Rebuilds one user file: reads it, replays every habit, merges the results and writes the new
+    snapshot. Runs inside a worker process, so only the file name goes in and a summary comes out.
+
+    Args:
+        task (tuple): (filename, history_dir, dry_run) where history_dir is the user's
+                      TieredHistoryStore directory or None, and dry_run leaves the file untouched.
+
+    Returns:
+        dict: The filename, the status ('rebuilt', 'checked' for a dry run, or 'skipped' with a
+              'reason'), and for rebuilt users the new progress values, habit streaks and 'changes'.
+    """
+    filename, history_dir, dry_run = task
+    with open(filename, 'r') as file:
+        data = json.load(file)
+    store = TieredHistoryStore(history_dir) if history_dir else None
+    histories = [completion_ordinals(habit_data, store) for habit_data in data['habits']]
+    summary = {'filename': filename, 'habits': len(histories)}
+
+    reason = missing_history(data, histories)
+    if reason:
+        return dict(summary, status='skipped', reason=reason)
+
+    results = [
+        replay_habit((habit_data.get('periodicity') or habit_data.get('habit_type', 'daily'), ordinals))
+        for habit_data, ordinals in zip(data['habits'], histories)
+    ]
+    state = merge_results(data, results)
+    if store is not None:
+        state = keep_recent(state, store)
+    if not dry_run:
+        write_atomically(state, filename)
+    summary.update({key: state[key] for key in ('level', 'total_xp', 'exp_needed', 'current_hp', 'coins')})
+    return dict(summary, status='checked' if dry_run else 'rebuilt', changes=describe_changes(data, state),
+                streaks=[habit_data['streak'] for habit_data in state['habits']])
+
+
+def write_atomically(data, filename):
+    """
+    Writes a JSON file through a temporary file so readers never see a partial snapshot.
+
+    Args:
+        data (dict): The data to save.
+        filename (str): The destination file.
+    """
+    temp_path = filename + '.tmp'
+    with open(temp_path, 'w') as file:
+        file.write(json.dumps(data))  # One C-encoded string instead of many small writes
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, filename)
+
+
+def rebuild(filenames, workers=None, progress=print, history_dirs=None, dry_run=False):
+    """
+    Recomputes streaks, XP, level, HP and coins of every user file from its completion history.
+
+    Users are rebuilt in parallel on a process pool, one user per task: each worker reads, replays,
+    merges and writes its user's file. Users whose progress is not backed by recorded completions
+    (e.g. files saved before completion dates were kept) are skipped and left unchanged.
+
+    Args:
+        filenames (list): The user JSON files to rebuild.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        progress (callable, optional): Called with a status message as work completes.
+                                       Pass None to run silently. Defaults to print.
+        history_dirs (dict, optional): User file -> TieredHistoryStore directory. Users with a store
+                                       keep only recent completions in their file, so their full
+                                       history is read through the store. Defaults to None.
+        dry_run (bool, optional): Only report what would change, without writing. Defaults to False.
+
+    Returns:
+        dict: The rebuild_user summary for each filename.
+    """
+    history_dirs = history_dirs or {}
+    tasks = [(filename, history_dirs.get(filename), dry_run) for filename in filenames]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    started = time.perf_counter()
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for done, summary in enumerate(executor.map(rebuild_user, tasks), 1):
+            filename = summary['filename']
+            summaries[filename] = summary
+            if not progress:
+                continue
+            elapsed = time.perf_counter() - started
+            if summary['status'] == 'skipped':
+                progress(f"Skipped {filename}: {summary['reason']} ({done}/{len(tasks)} users, {elapsed:.1f}s)")
+            elif dry_run:
+                changes = '; '.join(summary['changes']) or 'no changes'
+                progress(f"{filename}: {changes} ({done}/{len(tasks)} users, {elapsed:.1f}s)")
+            else:
+                progress(f"Rebuilt {filename} ({done}/{len(tasks)} users, {elapsed:.1f}s)")
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute all tracker snapshots from completion history")
+    parser.add_argument('files', nargs='+', help='User JSON files to rebuild in place')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--history-root', help='Folder with one history store per user, named after '
+                                               'the user file without its extension (e.g. alice/ for alice.json)')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing any file')
+    args = parser.parse_args()
+    history_dirs = {}
+    if args.history_root:
+        for filename in args.files:
+            directory = os.path.join(args.history_root, os.path.splitext(os.path.basename(filename))[0])
+            if os.path.isdir(directory):
+                history_dirs[filename] = directory
+    rebuild(args.files, args.workers, history_dirs=history_dirs, dry_run=args.dry_run)
@@ -0,0 +1,164 @@
+import heapq
+from collections import Counter
+
+
+class _TrieNode:
+    __slots__ = ('children', 'items')
+
+    def __init__(self):
+        self.children = {}
+        self.items = set()  # Keys of the items whose name ends at this node
+
+
+class SearchIndex:
+    # Name index over habits and rewards: a trie answers prefix queries and a trigram
+    # index answers substring and fuzzy queries, so a keystroke never rescans every name.
+
+    # Match ranks, best first
+    EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+
+    def __init__(self, fuzzy_threshold=0.3):
+        """
+        Initializes an empty index.
+
+        Args:
+            fuzzy_threshold (float, optional): Minimum trigram similarity (0-1) for a fuzzy match.
+                                               Defaults to 0.3.
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.items = {}  # (kind, name) -> the Habit or reward dict
+        self._root = _TrieNode()
+        self._grams = {}  # trigram -> set of item keys
+
+    @staticmethod
+    def trigrams(text):
+        """Returns the set of trigrams of a lowercased, space-padded text."""
+        padded = f"  {text.lower()} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, kind, name, item):
+        """
+        Adds or replaces an item.
+
+        Args:
+            kind (str): 'habit' or 'reward'.
+            name (str): The name to index.
+            item (object): The Habit or reward dict, used by the query filters.
+        """
+        key = (kind, name)
+        self.items[key] = item
+        node = self._root
+        for char in name.lower():
+            node = node.children.setdefault(char, _TrieNode())
+        node.items.add(key)
+        for gram in self.trigrams(name):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, kind, name):
+        """
+        Removes an item, if present.
+
+        Args:
+            kind (str): 'habit' or 'reward'.
+            name (str): The indexed name.
+        """
+        key = (kind, name)
+        if key not in self.items:
+            return
+        del self.items[key]
+        # Walk down the trie, then prune nodes that became empty
+        path = [self._root]
+        for char in name.lower():
+            path.append(path[-1].children[char])
+        path[-1].items.discard(key)
+        for parent, char, node in zip(reversed(path[:-1]), reversed(name.lower()), reversed(path[1:])):
+            if node.items or node.children:
+                break
+            del parent.children[char]
+        for gram in self.trigrams(name):
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._grams[gram]
+
+    def _prefix_matches(self, text):
+        node = self._root
+        for char in text:
+            node = node.children.get(char)
+            if node is None:
+                return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield from node.items
+            stack.extend(node.children.values())
+
+    def _substring_candidates(self, text):
+        if len(text) >= 3:
+            grams = [text[i:i + 3] for i in range(len(text) - 2)]
+            postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+            return set.intersection(*postings) if postings else set()
+        # Short queries: collect the items of every trigram that contains the text
+        candidates = set()
+        for gram, postings in self._grams.items():
+            if text in gram:
+                candidates |= postings
+        return candidates
+
+    def _fuzzy_matches(self, text):
+        query_grams = self.trigrams(text)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._grams.get(gram, ()))
+        for key, count in shared.items():
+            similarity = 2 * count / (len(query_grams) + len(self.trigrams(key[1])))
+            if similarity >= self.fuzzy_threshold:
+                yield key, similarity
+
+    def search(self, query, kind=None, periodicity=None, min_streak=None, limit=20, fuzzy=True):
+        """
+        Finds items by name, best matches first: exact, prefix, substring, then fuzzy.
+
+        Args:
+            query (str): The text typed by the user (case-insensitive). An empty query matches everything.
+            kind (str, optional): Only return 'habit' or 'reward' items.
+            periodicity (str, optional): Only return habits with this periodicity.
+            min_streak (int, optional): Only return habits with at least this current streak.
+            limit (int, optional): Maximum number of results. Defaults to 20; None for all.
+            fuzzy (bool, optional): Include fuzzy (typo-tolerant) matches. Defaults to True.
+
+        Returns:
+            list: (kind, name, item) tuples, best first.
+        """
+        text = query.strip().lower()
+
+        def accepted(key):
+            if kind and key[0] != kind:
+                return False
+            item = self.items[key]
+            if periodicity and getattr(item, 'periodicity', None) != periodicity:
+                return False
+            if min_streak is not None and getattr(item, 'current_streak', 0) < min_streak:
+                return False
+            return True
+
+        ranked = {}
+        for key in self._prefix_matches(text):
+            if accepted(key):
+                ranked[key] = (self.EXACT if key[1].lower() == text else self.PREFIX, 0)
+        # Lower tiers can only add results after the better ones, so skip them once the limit is filled
+        if text and (limit is None or len(ranked) < limit):
+            for key in self._substring_candidates(text):
+                if key not in ranked and text in key[1].lower() and accepted(key):
+                    ranked[key] = (self.SUBSTRING, key[1].lower().index(text))
+            if fuzzy and (limit is None or len(ranked) < limit):
+                for key, similarity in self._fuzzy_matches(text):
+                    if key not in ranked and accepted(key):
+                        ranked[key] = (self.FUZZY, -similarity)
+
+        def sort_key(key):
+            return ranked[key], len(key[1]), key[1].lower()
+
+        order = sorted(ranked, key=sort_key) if limit is None else heapq.nsmallest(limit, ranked, key=sort_key)
+        return [(key[0], key[1], self.items[key]) for key in order]
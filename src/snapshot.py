@@ -0,0 +1,173 @@
+from collections import namedtuple
+from collections.abc import Sequence
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+import events
+
+
+# Immutable copy of a Habit. Field names match the Habit attributes, so code that only
+# reads habits (statistics, exports) works the same on records. completion_dates is a
+# CompletionDates view and cold_segments lists the history store segments that held the
+# older completion dates at the same moment.
+HabitRecord = namedtuple('HabitRecord', ['name', 'periodicity', 'current_streak',
+                                         'last_completed_date', 'completion_dates', 'cold_segments'])
+
+
+class CompletionDates(Sequence):
+    # Read-only view of the first dates of a habit's completion list. Habits only append to
+    # their list (anything that trims it assigns a new list), so a snapshot shares the list
+    # and remembers its length instead of copying every date on every write.
+
+    __slots__ = ('_dates', '_length')
+
+    def __init__(self, dates):
+        """
+        Initializes the view with the dates the list holds now.
+
+        Args:
+            dates (list): The habit's completion_dates list.
+        """
+        self._dates = dates
+        self._length = len(dates)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._dates[:self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("completion date index out of range")
+        return self._dates[index]
+
+    def __iter__(self):
+        return islice(self._dates, self._length)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"CompletionDates({list(self)!r})"
+
+
+def habit_record(habit, history_store=None):
+    """Creates an immutable HabitRecord from a Habit and its current cold segments, if any."""
+    segments = history_store.get_segments(habit.name) if history_store is not None else ()
+    return HabitRecord(habit.name, habit.periodicity, habit.current_streak,
+                       habit.last_completed_date, CompletionDates(habit.completion_dates), segments)
+
+
+class StateSnapshot:
+    # A read-only, point-in-time view of a HabitTracker. A write creates a new snapshot that
+    # shares every unchanged habit record with the previous one, so taking a snapshot is O(1)
+    # and readers can keep using it while writers move on. Records are kept in a fixed number
+    # of shards, so a write copies only the shard of the habit it changed.
+
+    __slots__ = ('version', 'rewards', 'level', 'total_xp', 'exp_needed', 'current_hp', 'coins',
+                 'reward_costs', 'history_store', '_shards', '_next_position', '_habits')
+
+    shard_count = 64
+
+    def __init__(self, version, shards, next_position, rewards, progress, reward_costs, history_store=None):
+        """
+        Initializes a snapshot. Use from_tracker() or with_change() instead of calling this directly.
+
+        Args:
+            version (int): Increases by one with every write.
+            shards (tuple): shard_count dictionaries of habit name -> (position, HabitRecord), where
+                            the position orders the habits for display. Shards are shared between
+                            snapshots and must not be modified afterwards.
+            next_position (int): The position of the next habit added.
+            rewards (tuple): Read-only reward mappings.
+            progress (dict): The values returned by HabitTracker.get_progress().
+            reward_costs (dict): The reward costs of the tracker.
+            history_store (TieredHistoryStore, optional): Where older completion dates are kept.
+        """
+        self.version = version
+        self._shards = shards
+        self._next_position = next_position
+        self._habits = None
+        self.rewards = rewards
+        self.level = progress['level']
+        self.total_xp = progress['total_xp']
+        self.exp_needed = progress['exp_needed']
+        self.current_hp = progress['current_hp']
+        self.coins = progress['coins']
+        self.reward_costs = MappingProxyType(dict(reward_costs))
+        self.history_store = history_store
+
+    @classmethod
+    def from_tracker(cls, tracker, version=0):
+        """Creates a snapshot of the whole tracker state."""
+        shards = tuple({} for _ in range(cls.shard_count))
+        for position, habit in enumerate(tracker.habits):
+            shards[cls._shard_of(habit.name)][habit.name] = (position, habit_record(habit, tracker.history_store))
+        rewards = tuple(MappingProxyType(dict(reward)) for reward in tracker.rewards)
+        return cls(version, shards, len(tracker.habits), rewards, tracker.get_progress(),
+                   tracker.reward_costs, tracker.history_store)
+
+    @classmethod
+    def _shard_of(cls, name):
+        return hash(name) % cls.shard_count
+
+    def with_change(self, kind, key, tracker):
+        """
+        Returns the snapshot that follows this one after a single change.
+
+        Only the changed habit record and its shard (or the rewards or progress values) are
+        copied from the tracker; every other record is shared with this snapshot.
+
+        Args:
+            kind (str): The change event kind (see events.py).
+            key (str): The name of the habit or reward that changed.
+            tracker (HabitTracker): The tracker, already holding the new state.
+
+        Returns:
+            StateSnapshot: The new snapshot.
+        """
+        shards, next_position = self._shards, self._next_position
+        rewards, progress = self.rewards, self.get_progress()
+        if kind in (events.HABIT_ADDED, events.HABIT_UPDATED, events.HABIT_REMOVED):
+            index = self._shard_of(key)
+            shard = dict(shards[index])
+            habit = tracker.get_habit_by_name(key) if kind != events.HABIT_REMOVED else None
+            if habit is None:
+                shard.pop(key, None)
+            else:
+                position = shard[key][0] if key in shard else next_position
+                next_position = max(next_position, position + 1)
+                shard[key] = (position, habit_record(habit, tracker.history_store))
+            shards = shards[:index] + (shard,) + shards[index + 1:]
+        elif kind == events.PROGRESS_CHANGED:
+            progress = tracker.get_progress()
+        else:
+            rewards = tuple(MappingProxyType(dict(reward)) for reward in tracker.rewards)
+        return StateSnapshot(self.version + 1, shards, next_position, rewards, progress,
+                             self.reward_costs, self.history_store)
+
+    @property
+    def habits(self):
+        """The habit records in display order, built the first time a reader asks for them."""
+        habits = self._habits
+        if habits is None:
+            entries = sorted((entry for shard in self._shards for entry in shard.values()), key=itemgetter(0))
+            habits = self._habits = tuple(record for _, record in entries)
+        return habits
+
+    def get_habit_by_name(self, name):
+        """Returns the HabitRecord with the given name, or None if there is none."""
+        entry = self._shards[self._shard_of(name)].get(name)
+        return entry[1] if entry is not None else None
+
+    def get_progress(self):
+        """Returns the level, XP, XP needed, HP and coins in this snapshot."""
+        return {
+            'level': self.level,
+            'total_xp': self.total_xp,
+            'exp_needed': self.exp_needed,
+            'current_hp': self.current_hp,
+            'coins': self.coins
+        }
@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import events
+from events import ChangeEvent, EventBus
+from habit_tracker import HabitTracker
+
+
+class TestEventBus(unittest.TestCase):
+
+    def setUp(self):
+        """Create a tracker with an event bus and a listener that stores batches."""
+        self.bus = EventBus()
+        self.batches = []
+        self.bus.subscribe(self.batches.append)
+        self.tracker = HabitTracker(filename=None, event_bus=self.bus, clock=lambda: datetime(2025, 1, 1, 9, 0))
+
+    def test_events_coalesced_per_flush(self):
+        """Test that adding and completing a habit arrives as one added event plus progress."""
+        self.tracker.add_habit("Push Ups", "daily")
+        self.tracker.mark_habit("Push Ups")
+        self.bus.flush()
+        self.assertEqual(len(self.batches), 1)
+        kinds = [event.kind for event in self.batches[0]]
+        self.assertEqual(kinds, [events.HABIT_ADDED, events.PROGRESS_CHANGED])
+        self.assertEqual(self.batches[0][0].data['streak'], 1)
+        self.assertEqual(self.batches[0][1].data['total_xp'], 10)
+
+    def test_add_then_remove_cancels(self):
+        """Test that an item added and removed within a frame produces no event."""
+        self.tracker.create_reward("Movie Night", "easy")
+        self.tracker.delete_reward("Movie Night")
+        self.assertEqual(self.bus.flush(), [])
+        self.assertEqual(self.batches, [])
+
+    def test_removed_then_added_becomes_update(self):
+        """Test that removing and re-adding an item is delivered as an update."""
+        self.bus.publish(ChangeEvent(events.HABIT_REMOVED, "Run"))
+        self.bus.publish(ChangeEvent(events.HABIT_ADDED, "Run", {'name': "Run"}))
+        self.assertEqual(self.bus.flush(), [ChangeEvent(events.HABIT_UPDATED, "Run", {'name': "Run"})])
+
+    def test_reward_recreated_becomes_reward_update(self):
+        """Test that deleting and re-creating a reward is not delivered as an exchange."""
+        self.tracker.create_reward("Movie Night", "easy")
+        self.bus.flush()
+        self.tracker.delete_reward("Movie Night")
+        self.tracker.create_reward("Movie Night", "hard")
+        self.assertEqual([event.kind for event in self.bus.flush()], [events.REWARD_UPDATED])
+
+    def test_habit_events_carry_row_fields(self):
+        """Test that habit events carry the fields of the habit's row, not its completion history."""
+        self.tracker.add_habit("Push Ups", "daily")
+        self.tracker.mark_habit("Push Ups")
+        event = self.bus.flush()[0]
+        self.assertEqual(event.data, self.tracker.habits[0].to_row())
+        self.assertNotIn('completion_dates', event.data)
+
+    def test_reload_publishes_outside_changes(self):
+        """Test that changes written by another process are published after a reload."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'habits.json')
+            tracker = HabitTracker(filename=path, event_bus=self.bus)
+            tracker.add_habit("Push Ups", "daily")
+            self.bus.flush()
+
+            other = HabitTracker(filename=path)
+            other.add_habit("Read", "weekly")
+            os.utime(path, (time.time() + 5, time.time() + 5))  # Make sure the change is visible
+
+            self.assertTrue(tracker.reload_if_changed())
+            self.assertEqual(self.bus.flush(), [ChangeEvent(events.HABIT_ADDED, "Read", other.habits[1].to_row())])
+            self.assertFalse(tracker.reload_if_changed())
+
+    def test_partial_file_is_skipped(self):
+        """Test that a half-written file does not reset the tracker."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'habits.json')
+            tracker = HabitTracker(filename=path, event_bus=self.bus)
+            tracker.add_habit("Push Ups", "daily")
+            with open(path, 'r') as file:
+                content = file.read()
+            with open(path, 'w') as file:
+                file.write(content[:len(content) // 2])
+            os.utime(path, (time.time() + 5, time.time() + 5))
+
+            self.assertFalse(tracker.reload_if_changed())
+            self.assertEqual([habit.name for habit in tracker.habits], ["Push Ups"])
+            with open(path, 'w') as file:
+                file.write(content)
+            os.utime(path, (time.time() + 10, time.time() + 10))
+            self.assertTrue(tracker.reload_if_changed())
+            self.assertEqual(os.listdir(temp_dir), ['habits.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
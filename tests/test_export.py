@@ -0,0 +1,78 @@
+import sys
+import os
+import csv
+import io
+import json
+import subprocess
+import tempfile
+import unittest
+from datetime import date
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit_tracker import HabitTracker
+from export import export, iter_statistics
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        """Load the sample dataset into a tracker."""
+        dataset = os.path.join(os.path.dirname(__file__), '..', 'src', 'habits_dataset.json')
+        self.tracker = HabitTracker(filename=dataset)
+        self.tracker.rewards.append({'name': 'Movie Night', 'difficulty': 'easy', 'last_exchanged': None})
+
+    def test_completions_ndjson(self):
+        """Test exporting completion events as NDJSON."""
+        output = io.StringIO()
+        count = export(self.tracker, 'completions', output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(count, len(lines))
+        self.assertEqual(json.loads(lines[0]), {'habit': 'Push Ups', 'periodicity': 'daily', 'date': '2025-01-01'})
+
+    def test_filters(self):
+        """Test the date range, periodicity and prefix filters."""
+        output = io.StringIO()
+        export(self.tracker, 'completions', output, start=date(2025, 1, 9), end=date(2025, 1, 9),
+               periodicity='daily', prefix='push')
+        self.assertEqual(output.getvalue().splitlines(),
+                         ['{"habit": "Push Ups", "periodicity": "daily", "date": "2025-01-09"}'])
+
+    def test_statistics_csv(self):
+        """Test exporting per-habit statistics as CSV."""
+        output = io.StringIO()
+        export(self.tracker, 'statistics', output, fmt='csv')
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), len(self.tracker.habits))
+        self.assertEqual(rows[0]['longest_streak'], '9')
+
+    def test_weekly_longest_streak(self):
+        """Test that weekly streaks count consecutive weeks."""
+        rows = {row['habit']: row for row in iter_statistics(self.tracker, periodicity='weekly')}
+        self.assertEqual(rows['Review Goals']['longest_streak'], 2)
+
+    def test_rewards_and_summary(self):
+        """Test exporting rewards and the summary row."""
+        output = io.StringIO()
+        export(self.tracker, 'rewards', output)
+        self.assertEqual(json.loads(output.getvalue())['cost'], 50)
+        output = io.StringIO()
+        export(self.tracker, 'summary', output)
+        self.assertEqual(json.loads(output.getvalue())['habits'], len(self.tracker.habits))
+
+    def test_cli_output_is_only_data(self):
+        """Test that loading messages go to stderr, not into the exported stream."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'broken.json')
+            with open(path, 'w') as file:
+                file.write('{"habits": [')
+            script = os.path.join(os.path.dirname(__file__), '..', 'src', 'export.py')
+            result = subprocess.run([sys.executable, script, path, 'summary'], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout)['habits'], 0)
+        self.assertIn('invalid JSON', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit import Habit
+from habit_tracker import HabitTracker
+from history import HabitHistory
+from history_store import TieredHistoryStore
+from load_test import FakeClock
+
+
+class TestHabitHistory(unittest.TestCase):
+
+    def setUp(self):
+        """Build a history of 30 days of daily completions with small checkpoint intervals."""
+        self.start = datetime(2025, 1, 1, 8, 0)
+        self.history = HabitHistory(checkpoint_every=5, checkpoint_days=3)
+        self.live = HabitTracker(filename=None)
+        self.history.record('add_habit', self.start, name="Push Ups", periodicity="daily")
+        self.live.habits.append(Habit("Push Ups", "daily"))
+        for day in range(30):
+            at = self.start + timedelta(days=day, hours=1)
+            self.live.apply_completion(self.live.habits[0], at)
+            self.history.record('complete', at, name="Push Ups")
+
+    def test_checkpoints_taken(self):
+        """Test that checkpoints are taken periodically."""
+        self.assertGreater(len(self.history.checkpoints), 5)
+
+    def test_as_of_matches_live_replay(self):
+        """Test that the reconstructed state at the end equals the live state."""
+        rebuilt = self.history.as_of(self.start + timedelta(days=40))
+        self.assertEqual(rebuilt.get_state(), self.live.get_state())
+
+    def test_as_of_past_date(self):
+        """Test reconstructing the streak on a past date."""
+        rebuilt = self.history.as_of(self.start + timedelta(days=9, hours=2))
+        self.assertEqual(rebuilt.habits[0].current_streak, 10)
+        self.assertEqual(self.history.as_of(self.start - timedelta(days=1)).habits, [])
+
+    def test_undo(self):
+        """Test undoing the last operations."""
+        restored = self.history.undo(3)
+        self.assertEqual(restored.habits[0].current_streak, 27)
+        self.assertEqual(len(self.history.events), 28)
+
+    def test_checkpoints_store_new_dates_only(self):
+        """Test that checkpoints do not copy the full completion history each time."""
+        stored = sum(len(habit['completion_dates'])
+                     for _, _, state in self.history.checkpoints for habit in state['habits'])
+        self.assertLessEqual(stored, 30)
+        rebuilt = self.history.as_of(self.start + timedelta(days=20, hours=2))
+        self.assertEqual(rebuilt.habits[0].completion_dates, self.live.habits[0].completion_dates[:21])
+
+    def test_tracker_undo(self):
+        """Test that undoing on the tracker keeps the tracker and the log in step."""
+        clock = FakeClock(self.start)
+        tracker = HabitTracker(filename=None, history=HabitHistory(), clock=clock)
+        tracker.add_habit("Push Ups", "daily")
+        for _ in range(6):
+            tracker.mark_habit("Push Ups")
+            clock.advance(days=1)
+        tracker.undo(2)
+        self.assertEqual(tracker.habits[0].current_streak, 4)
+        clock.advance(days=1)  # The undone days are now missing, so the streak restarts
+        tracker.mark_habit("Push Ups")
+        self.assertEqual(tracker.habits[0].current_streak, 1)
+        self.assertEqual(tracker.history.as_of(clock()).get_state(), tracker.get_state())
+
+    def test_undo_truncates_cold_history(self):
+        """Test that undoing completions that were spilled also removes them from cold storage."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        store = TieredHistoryStore(temp_dir, hot_size=2, segment_size=4)
+        clock = FakeClock(self.start)
+        tracker = HabitTracker(filename=None, history=HabitHistory(), history_store=store, clock=clock)
+        tracker.add_habit("Push Ups", "daily")
+        for _ in range(15):
+            tracker.mark_habit("Push Ups")
+            clock.advance(days=1)
+        tracker.undo(12)
+        habit = tracker.habits[0]
+        self.assertEqual(habit.current_streak, 3)
+        self.assertEqual(store.count(habit), 3)
+        self.assertEqual(tracker.get_completion_history(habit),
+                         [(self.start + timedelta(days=day)).date() for day in range(3)])
+
+    def test_history_of_tracker_file(self):
+        """Test that a history starts from the loaded file and is saved next to it."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'habits.json')
+        shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'src', 'habits_dataset.json'), path)
+        clock = FakeClock(datetime(2025, 1, 10, 9, 0))
+        tracker = HabitTracker(filename=path, history=HabitHistory(), clock=clock)
+        tracker.mark_habit("Push Ups")
+        self.assertEqual(tracker.history.as_of(clock()).get_habit_by_name("Push Ups").current_streak, 9)
+
+        reopened = HabitTracker(filename=path, history=HabitHistory(), clock=clock)
+        self.assertTrue(os.path.exists(os.path.join(temp_dir, 'habits.history.ndjson')))
+        self.assertEqual(len(reopened.history.events), 1)
+        self.assertEqual(reopened.history.as_of(clock()).get_state(), reopened.get_state())
+
+    def test_history_file_is_appended(self):
+        """Test that saving appends only the new events, and that an undo rewrites the file."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'habits.json')
+        clock = FakeClock(self.start)
+        tracker = HabitTracker(filename=path, history=HabitHistory(), clock=clock)
+        tracker.add_habit("Push Ups", "daily")
+        history_path = tracker.get_history_path()
+        with open(history_path) as file:
+            before = file.read()
+        tracker.mark_habit("Push Ups")
+        with open(history_path) as file:
+            after = file.read()
+        self.assertTrue(after.startswith(before))
+        self.assertEqual(after.count('\n'), before.count('\n') + 1)
+
+        tracker.undo()
+        reopened = HabitTracker(filename=path, history=HabitHistory(), clock=clock)
+        self.assertEqual([event['op'] for event in reopened.history.events], ['add_habit'])
+        self.assertEqual(reopened.get_state(), tracker.get_state())
+
+    def test_round_trip(self):
+        """Test serializing and restoring the history."""
+        copy = HabitHistory.from_dict(self.history.to_dict())
+        end = self.start + timedelta(days=40)
+        self.assertEqual(copy.as_of(end).get_state(), self.history.as_of(end).get_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit import Habit
+from history_store import TieredHistoryStore
+
+
+class TestTieredHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        """Create a habit with 1000 days of history and a small store."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.start = date(2020, 1, 1)
+        self.days = [self.start + timedelta(days=offset) for offset in range(1000)]
+        self.habit = Habit("Push Ups", "daily", completion_dates=self.days)
+        self.store = TieredHistoryStore(self.temp_dir.name, hot_size=10, segment_size=100, memory_budget=250)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_attach_keeps_recent_window(self):
+        """Test that only the recent completions stay in memory."""
+        self.store.attach(self.habit)
+        self.assertLess(len(self.habit.completion_dates), 110)
+        self.assertEqual(self.habit.completion_dates[-1], self.days[-1])
+        self.assertEqual(self.store.count(self.habit), 1000)
+
+    def test_full_history_paged_in(self):
+        """Test that the full history can be read back and the cache respects the budget."""
+        self.store.attach(self.habit)
+        self.assertEqual(list(self.store.iter_history(self.habit)), self.days)
+        self.assertLessEqual(self.store._cached_dates, 250)
+
+    def test_range_query(self):
+        """Test reading a date range."""
+        self.store.attach(self.habit)
+        start, end = self.days[150], self.days[160]
+        self.assertEqual(list(self.store.iter_history(self.habit, start, end)), self.days[150:161])
+
+    def test_spill_after_completion(self):
+        """Test that new completions spill into cold storage and survive a reload."""
+        self.store.attach(self.habit)
+        completed_at = datetime.combine(self.days[-1], datetime.min.time())
+        for _ in range(200):
+            completed_at += timedelta(days=1)
+            self.habit.mark_complete(completed_at)
+            self.store.spill(self.habit)
+        self.assertLess(len(self.habit.completion_dates), 110)
+
+        reloaded = TieredHistoryStore(self.temp_dir.name, hot_size=10, segment_size=100, compression='gzip')
+        self.assertEqual(reloaded.count(self.habit), 1200)
+
+    def test_drop(self):
+        """Test removing the cold history of a deleted habit."""
+        self.store.attach(self.habit)
+        self.store.drop(self.habit.name)
+        self.assertEqual(os.listdir(self.temp_dir.name), ['index.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import sys
+import os
+import unittest
+from datetime import datetime
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit_tracker import HabitTracker
+from load_test import FakeClock, LatencyHistogram, find_problems, format_report, run_soak
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_fake_clock_drives_completions(self):
+        """Test that the injected clock is used when marking habits."""
+        clock = FakeClock(datetime(2025, 1, 1, 9, 0))
+        tracker = HabitTracker(filename=None, clock=clock)
+        tracker.add_habit("Push Ups", "daily")
+        for _ in range(3):
+            tracker.mark_habit("Push Ups")
+            clock.advance(days=1)
+        self.assertEqual(tracker.habits[0].current_streak, 3)
+        self.assertEqual(tracker.habits[0].last_completed_date, datetime(2025, 1, 3, 9, 0))
+
+    def test_histogram(self):
+        """Test histogram buckets and percentiles."""
+        histogram = LatencyHistogram()
+        for seconds in (0.0001, 0.0001, 0.0001, 0.01):
+            histogram.record(seconds)
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.percentile(0.5), 0.000128)
+        self.assertEqual(histogram.maximum, 0.01)
+
+    def test_find_problems(self):
+        """Test that latency growing faster than the data is flagged."""
+        samples = [
+            {'mark_mean': 0.001, 'completions': 100, 'file_bytes': 1000, 'memory_bytes': 1000},
+            {'mark_mean': 0.010, 'completions': 200, 'file_bytes': 2000, 'memory_bytes': 2000}
+        ]
+        flags = find_problems(samples)
+        self.assertEqual(len(flags), 1)
+        self.assertTrue(flags[0].startswith("Superlinear slowdown"))
+
+    def test_short_soak(self):
+        """Test a short run end to end."""
+        report = run_soak(users=3, days=14, workers=2, trace_memory=False)
+        self.assertGreater(report['operations'], 0)
+        self.assertEqual([sample['day'] for sample in report['samples']], [7, 14])
+        self.assertIn("Soak Test Report", format_report(report))
+
+
+if __name__ == '__main__':
+    unittest.main()
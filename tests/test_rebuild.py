@@ -0,0 +1,119 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit import Habit
+from habit_tracker import HabitTracker
+from history_store import TieredHistoryStore
+from load_test import FakeClock
+from rebuild import rebuild
+
+
+class TestRebuild(unittest.TestCase):
+
+    def setUp(self):
+        """Copy the sample dataset into two user files."""
+        self.temp_dir = tempfile.mkdtemp()
+        dataset = os.path.join(os.path.dirname(__file__), '..', 'src', 'habits_dataset.json')
+        self.files = []
+        for user in ('alice.json', 'bob.json'):
+            path = os.path.join(self.temp_dir, user)
+            shutil.copy(dataset, path)
+            self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def serial_replay(self, filename):
+        """Replay every completion in date order through the tracker, one at a time."""
+        tracker = HabitTracker(filename=None)
+        with open(filename, 'r') as file:
+            data = json.load(file)
+        events = []
+        for position, habit_data in enumerate(data['habits']):
+            habit = Habit.from_dict(habit_data)
+            tracker.habits.append(Habit(habit.name, habit.periodicity))
+            events.extend((day, position) for day in habit.completion_dates)
+        for day, position in sorted(events):
+            tracker.apply_completion(tracker.habits[position], datetime.combine(day, datetime.min.time()))
+        return tracker
+
+    def test_rebuild_matches_serial_replay(self):
+        """Test that the parallel rebuild gives the same results as a serial replay."""
+        expected = [self.serial_replay(path) for path in self.files]
+        rebuilt = rebuild(self.files, workers=2, progress=None)
+        for path, tracker in zip(self.files, expected):
+            summary = rebuilt[path]
+            self.assertEqual(summary['status'], 'rebuilt')
+            self.assertEqual(summary['level'], tracker.level)
+            self.assertEqual(summary['total_xp'], tracker.total_xp)
+            self.assertEqual(summary['coins'], tracker.coins)
+            self.assertEqual(summary['streaks'], [habit.current_streak for habit in tracker.habits])
+
+    def test_snapshot_written(self):
+        """Test that the rebuilt snapshot replaces the user file."""
+        rebuilt = rebuild(self.files[:1], workers=1, progress=None)
+        with open(self.files[0], 'r') as file:
+            state = json.load(file)
+        self.assertEqual(state['level'], rebuilt[self.files[0]]['level'])
+        self.assertEqual([habit['streak'] for habit in state['habits']], rebuilt[self.files[0]]['streaks'])
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['alice.json', 'bob.json'])
+
+    def test_dry_run_leaves_files_unchanged(self):
+        """Test that a dry run reports the changes without writing them."""
+        with open(self.files[0], 'r') as file:
+            before = file.read()
+        messages = []
+        rebuilt = rebuild(self.files[:1], workers=1, progress=messages.append, dry_run=True)
+        with open(self.files[0], 'r') as file:
+            self.assertEqual(file.read(), before)
+        summary = rebuilt[self.files[0]]
+        self.assertEqual(summary['status'], 'checked')
+        self.assertIn(f"level 10 -> {summary['level']}", summary['changes'])
+        self.assertIn(summary['changes'][0], messages[0])
+
+    def test_users_without_history_are_skipped(self):
+        """Test that a file saved without completion dates is not overwritten with zeroed progress."""
+        with open(self.files[0], 'r') as file:
+            data = json.load(file)
+        for habit_data in data['habits']:
+            del habit_data['completion_dates']
+        with open(self.files[0], 'w') as file:
+            json.dump(data, file)
+        rebuilt = rebuild(self.files, workers=2, progress=None)
+        self.assertEqual(rebuilt[self.files[0]]['status'], 'skipped')
+        self.assertEqual(rebuilt[self.files[1]]['status'], 'rebuilt')
+        with open(self.files[0], 'r') as file:
+            self.assertEqual(json.load(file), data)
+
+    def test_cold_history_is_replayed(self):
+        """Test that completions moved to cold storage are part of the rebuild."""
+        path = os.path.join(self.temp_dir, 'carol.json')
+        store_dir = os.path.join(self.temp_dir, 'carol')
+        store = TieredHistoryStore(store_dir, hot_size=5, segment_size=10)
+        clock = FakeClock(datetime(2025, 1, 1, 9, 0))
+        tracker = HabitTracker(filename=path, history_store=store, clock=clock)
+        tracker.add_habit("Push Ups", "daily")
+        for _ in range(40):
+            tracker.mark_habit("Push Ups")
+            clock.advance(days=1)
+        self.assertLess(len(tracker.habits[0].completion_dates), 40)
+
+        summary = rebuild([path], workers=1, progress=None, history_dirs={path: store_dir})[path]
+        self.assertEqual((summary['level'], summary['total_xp'], summary['coins']),
+                         (tracker.level, tracker.total_xp, tracker.coins))
+        with open(path, 'r') as file:
+            state = json.load(file)
+        self.assertEqual(state['habits'][0]['streak'], 40)
+        self.assertEqual(state['habits'][0]['completion_dates'], tracker.habits[0].to_dict()['completion_dates'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit import Habit
+from habit_tracker import HabitTracker
+from search import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Create a tracker with a few habits and rewards."""
+        self.tracker = HabitTracker(filename=None)
+        self.tracker.habits = [
+            Habit("Push Ups", "daily", streak=8),
+            Habit("Pull Ups", "daily", streak=2),
+            Habit("Morning Run", "daily", streak=5),
+            Habit("Review Goals", "weekly", streak=3),
+            Habit("Push", "weekly")
+        ]
+        self.tracker.rewards = [{'name': "Movie Night", 'difficulty': 'easy', 'last_exchanged': None}]
+
+    def names(self, habits):
+        return [habit.name for habit in habits]
+
+    def test_prefix_ranking(self):
+        """Test that exact matches come before longer prefix matches."""
+        self.assertEqual(self.names(self.tracker.search_habits("push"))[:2], ["Push", "Push Ups"])
+
+    def test_substring(self):
+        """Test matching text in the middle of a name."""
+        self.assertEqual(self.names(self.tracker.search_habits("ups"))[:2], ["Pull Ups", "Push Ups"])
+        self.assertEqual(self.names(self.tracker.search_habits("un")), ["Morning Run"])
+
+    def test_fuzzy(self):
+        """Test that a typo still finds the habit."""
+        self.assertEqual(self.names(self.tracker.search_habits("mornig run"))[0], "Morning Run")
+
+    def test_filters(self):
+        """Test the periodicity and streak filters."""
+        self.assertEqual(self.names(self.tracker.search_habits("", periodicity="weekly", limit=None)),
+                         ["Push", "Review Goals"])
+        self.assertEqual(self.names(self.tracker.search_habits("u", min_streak=5)), ["Push Ups", "Morning Run"])
+
+    def test_rewards(self):
+        """Test searching rewards separately from habits."""
+        self.assertEqual(self.tracker.search_rewards("movie")[0]['name'], "Movie Night")
+        self.assertEqual(self.tracker.search_habits("movie"), [])
+
+    def test_incremental_updates(self):
+        """Test that adding and deleting habits updates an index that was already built."""
+        self.tracker.search_habits("push")
+        self.tracker.add_habit("Pushing Limits", "daily")
+        self.assertIn("Pushing Limits", self.names(self.tracker.search_habits("pushing")))
+        with mock.patch('builtins.input', return_value='yes'):
+            self.tracker.delete_habit("Push Ups")
+        self.assertNotIn("Push Ups", self.names(self.tracker.search_habits("push", limit=None)))
+
+    def test_remove_prunes_trie(self):
+        """Test that removing the last item leaves an empty trie."""
+        index = SearchIndex()
+        index.add('habit', "Read", None)
+        index.remove('habit', "Read")
+        self.assertEqual(index._root.children, {})
+        self.assertEqual(index._grams, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
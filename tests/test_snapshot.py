@@ -0,0 +1,160 @@
+import sys
+import os
+import io
+import json
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from datetime import datetime
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from export import export
+from habit_tracker import HabitTracker
+from history_store import TieredHistoryStore
+from load_test import FakeClock
+from sync import Replica
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        """Create a tracker with two habits."""
+        self.clock = FakeClock(datetime(2025, 1, 1, 9, 0))
+        self.tracker = HabitTracker(filename=None, clock=self.clock)
+        self.tracker.add_habit("Push Ups", "daily")
+        self.tracker.add_habit("Read", "daily")
+
+    def test_snapshot_is_stable(self):
+        """Test that a snapshot does not change when the tracker is written to."""
+        before = self.tracker.snapshot()
+        self.assertIs(self.tracker.snapshot(), before)
+        self.tracker.mark_habit("Push Ups")
+        after = self.tracker.snapshot()
+
+        self.assertEqual(before.get_habit_by_name("Push Ups").current_streak, 0)
+        self.assertEqual(before.total_xp, 0)
+        self.assertEqual(after.get_habit_by_name("Push Ups").current_streak, 1)
+        self.assertEqual(after.total_xp, 10)
+        self.assertGreater(after.version, before.version)
+
+    def test_unchanged_records_are_shared(self):
+        """Test that a write only replaces the record of the habit it changed."""
+        before = self.tracker.snapshot()
+        self.tracker.mark_habit("Push Ups")
+        after = self.tracker.snapshot()
+        self.assertIs(after.get_habit_by_name("Read"), before.get_habit_by_name("Read"))
+        self.assertIsNot(after.get_habit_by_name("Push Ups"), before.get_habit_by_name("Push Ups"))
+
+    def test_habits_keep_display_order(self):
+        """Test that snapshot habits stay in tracker order across updates, removals and re-adds."""
+        for number in range(100):
+            self.tracker.add_habit(f"Habit {number}", "daily")
+        self.tracker.snapshot()
+        self.tracker.mark_habit("Habit 50")
+        with mock.patch('builtins.input', return_value='yes'):
+            self.tracker.delete_habit("Read")
+        self.tracker.add_habit("Read", "weekly")
+        names = [habit.name for habit in self.tracker.snapshot().habits]
+        self.assertEqual(names, [habit.name for habit in self.tracker.habits])
+        self.assertEqual(self.tracker.snapshot().get_habit_by_name("Read").periodicity, "weekly")
+
+    def test_completion_dates_are_shared_not_copied(self):
+        """Test that a record keeps the dates it was taken with while the habit keeps growing."""
+        before = self.tracker.snapshot().get_habit_by_name("Push Ups")
+        for _ in range(3):
+            self.tracker.mark_habit("Push Ups")
+            self.clock.advance(days=1)
+        after = self.tracker.snapshot().get_habit_by_name("Push Ups")
+        self.assertEqual(len(before.completion_dates), 0)
+        self.assertEqual(list(after.completion_dates), self.tracker.habits[0].completion_dates)
+        self.assertEqual(after.completion_dates[-1], self.tracker.habits[0].completion_dates[2])
+
+    def test_write_is_published_atomically(self):
+        """Test that readers never see a completion without its XP."""
+        self.tracker.snapshot()
+        stop = threading.Event()
+        torn = []
+
+        def reader():
+            while not stop.is_set():
+                state = self.tracker.snapshot()
+                streaks = sum(habit.current_streak for habit in state.habits)
+                if state.coins != streaks * self.tracker.coins_per_completion:
+                    torn.append(state.version)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for _ in range(200):
+            self.tracker.mark_habit("Push Ups")
+            self.clock.advance(days=1)
+        stop.set()
+        thread.join()
+        self.assertEqual(torn, [])
+
+    def test_sync_updates_snapshot(self):
+        """Test that changes merged by sync reach the snapshot."""
+        replica = Replica('laptop')
+        replica.tracker.snapshot()
+        replica.add_habit("Run", "daily")
+        replica.complete("Run", datetime(2025, 1, 1))
+        state = replica.tracker.snapshot()
+        self.assertEqual(state.get_habit_by_name("Run").current_streak, 1)
+        self.assertEqual(state.coins, 10)
+
+    def test_statistics_text(self):
+        """Test that view_statistics reports from the snapshot."""
+        self.tracker.mark_habit("Push Ups")
+        self.assertIn("Longest Streak: 1", self.tracker.view_statistics())
+
+    def test_snapshot_keeps_its_cold_segments(self):
+        """Test that spilling history after a snapshot does not change what the snapshot reads."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = TieredHistoryStore(temp_dir, hot_size=2, segment_size=3, memory_budget=3)
+            tracker = HabitTracker(filename=None, history_store=store, clock=self.clock)
+            tracker.add_habit("Push Ups", "daily")
+            for _ in range(4):
+                tracker.mark_habit("Push Ups")
+                self.clock.advance(days=1)
+            before = tracker.snapshot()
+            tracker.mark_habit("Push Ups")  # Spills the oldest dates into a new segment
+            self.assertEqual(len(store.get_segments("Push Ups")), 1)
+
+            output = io.StringIO()
+            export(tracker, 'completions', output)
+            dates = [json.loads(line)['date'] for line in output.getvalue().splitlines()]
+            self.assertEqual(len(dates), 5)
+            record = before.habits[0]
+            old_dates = [day.isoformat() for day in store.iter_history(record, segments=record.cold_segments)]
+            self.assertEqual(old_dates, dates[:4])
+
+    def test_concurrent_reads_keep_cache_consistent(self):
+        """Test that readers sharing the segment cache with a writer keep its size accounting right."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = TieredHistoryStore(temp_dir, hot_size=2, segment_size=3, memory_budget=6)
+            tracker = HabitTracker(filename=None, history_store=store, clock=self.clock)
+            for name in ("Push Ups", "Read"):
+                tracker.add_habit(name, "daily")
+            stop = threading.Event()
+
+            def reader():
+                while not stop.is_set():
+                    export(tracker, 'completions', io.StringIO())
+
+            threads = [threading.Thread(target=reader) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for _ in range(60):
+                tracker.mark_habit("Push Ups")
+                tracker.mark_habit("Read")
+                self.clock.advance(days=1)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(store._cached_dates, sum(len(days) for days in store._cache.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
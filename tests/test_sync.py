@@ -0,0 +1,204 @@
+import sys
+import os
+import json
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta
+
+# Add the path to the src folder so Python can find it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from habit_tracker import HabitTracker
+from history_store import TieredHistoryStore
+from load_test import FakeClock
+from sync import Replica, SyncServer
+
+
+class TestSync(unittest.TestCase):
+
+    def setUp(self):
+        """Create a server and two replicas sharing one habit and one reward."""
+        self.server = SyncServer()
+        self.laptop = Replica('laptop')
+        self.phone = Replica('phone')
+        self.start = datetime(2025, 1, 1, 9, 0)
+        self.laptop.add_habit("Push Ups", "daily")
+        self.laptop.create_reward("Movie Night", "easy")
+        self.laptop.sync(self.server)
+        self.phone.sync(self.server)
+
+    def test_concurrent_completions_merge(self):
+        """Test that completions made on different devices are all kept."""
+        for day in range(0, 10, 2):
+            self.laptop.complete("Push Ups", self.start + timedelta(days=day))
+        for day in range(1, 10, 2):
+            self.phone.complete("Push Ups", self.start + timedelta(days=day))
+        self.laptop.sync(self.server)
+        self.phone.sync(self.server)
+        self.laptop.sync(self.server)
+
+        self.assertEqual(self.laptop.tracker.get_state(), self.phone.tracker.get_state())
+        self.assertEqual(self.phone.tracker.habits[0].current_streak, 10)
+        self.assertEqual(self.phone.tracker.coins, 100)
+
+    def test_only_deltas_are_sent(self):
+        """Test that a sync only transfers operations created since the last one."""
+        self.laptop.complete("Push Ups", self.start)
+        stats = self.laptop.sync(self.server)
+        self.assertEqual(stats['sent'], 1)
+        self.assertEqual(stats['received'], 0)
+        stats = self.phone.sync(self.server)
+        self.assertEqual((stats['sent'], stats['received']), (0, 1))
+        self.assertEqual(self.phone.sync(self.server)['received'], 0)
+
+    def test_merge_is_order_independent(self):
+        """Test that replicas applying the same operations in any order converge."""
+        for day in range(30):
+            replica = self.laptop if day % 3 else self.phone
+            replica.complete("Push Ups", self.start + timedelta(days=day))
+            if day % 7 == 6:
+                replica.exchange_reward("Movie Night", self.start + timedelta(days=day, hours=12))
+        self.phone.remove_habit("Push Ups")
+        self.laptop.add_habit("Push Ups", "daily")  # Concurrent re-add
+        operations = self.laptop.local_ops + self.phone.local_ops
+
+        shuffled = Replica('tablet')
+        random.Random(1).shuffle(operations)
+        for operation in operations:
+            shuffled.apply([operation])
+        in_order = Replica('desktop')
+        in_order.apply(sorted(operations, key=lambda op: tuple(op['id'])))
+
+        self.assertEqual(shuffled.tracker.get_state(), in_order.tracker.get_state())
+        self.assertEqual(shuffled.tracker.habits[0].current_streak, 30)
+
+    def test_remove_wins_when_later(self):
+        """Test that a later removal hides the habit on every replica."""
+        self.phone.remove_habit("Push Ups")
+        self.phone.sync(self.server)
+        self.laptop.sync(self.server)
+        self.assertEqual(self.laptop.tracker.habits, [])
+
+    def test_restart_keeps_operation_ids(self):
+        """Test that a restarted replica continues from its saved operations and positions."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'tablet.sync.ndjson')
+            tablet = Replica('tablet', filename=path)
+            tablet.sync(self.server)
+            tablet.complete("Push Ups", self.start)
+            tablet.sync(self.server)
+
+            restarted = Replica('tablet', filename=path)
+            self.assertEqual(restarted.tracker.get_state(), tablet.tracker.get_state())
+            restarted.add_habit("Read", "daily")
+            self.assertEqual(restarted.sync(self.server)['sent'], 1)
+            self.phone.sync(self.server)
+            self.assertEqual([habit.name for habit in self.phone.tracker.habits], ["Push Ups", "Read"])
+
+    def test_reused_ids_are_rejected(self):
+        """Test that operations reusing another operation's id are reported, not silently dropped."""
+        restarted = Replica('laptop')  # Same id, but its earlier operations were lost
+        restarted.add_habit("Read", "daily")
+        with self.assertRaises(ValueError):
+            restarted.sync(self.server)
+
+    def test_existing_tracker_is_synced(self):
+        """Test that wrapping a tracker keeps its data and syncs changes made through the tracker."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'habits.json')
+            shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'src', 'habits_dataset.json'), path)
+            tracker = HabitTracker(filename=path, clock=FakeClock(datetime(2025, 1, 10, 9, 0)))
+            count = len(tracker.habits)
+            desktop = Replica('desktop', tracker=tracker)
+            tracker.add_habit("Stretch", "daily")
+            self.assertEqual(len(tracker.habits), count + 1)
+            completed, _ = tracker.mark_habit("Push Ups")
+            self.assertTrue(completed)
+            self.assertFalse(tracker.mark_habit("Push Ups")[0])  # Already completed today
+
+            # Progress is derived from the operations only, not mixed with the loaded totals
+            derived = Replica('check')
+            derived.apply(desktop.local_ops)
+            self.assertEqual(derived.tracker.get_progress(), tracker.get_progress())
+            self.assertEqual(HabitTracker(filename=path).get_state(), tracker.get_state())
+
+            desktop.sync(self.server)
+            self.phone.sync(self.server)
+            phone_habits = {habit.name: habit for habit in self.phone.tracker.habits}
+            self.assertEqual(len(phone_habits), count + 1)  # "Push Ups" also exists on the phone
+            self.assertEqual(phone_habits["Push Ups"].last_completed_date, datetime(2025, 1, 10))
+
+
+    def test_existing_progress_is_kept(self):
+        """Test that syncing a saved tracker keeps its progress, including files without completion dates."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'habits.json')
+            with open(os.path.join(os.path.dirname(__file__), '..', 'src', 'habits_dataset.json')) as file:
+                data = json.load(file)
+            for habit_data in data['habits']:
+                del habit_data['completion_dates']  # Saved before completion dates were recorded
+            data['rewards'] = [{'name': "Cake", 'difficulty': 'easy', 'last_exchanged': '2025-01-05 12:00:00'}]
+            with open(path, 'w') as file:
+                json.dump(data, file)
+            tracker = HabitTracker(filename=path, clock=FakeClock(datetime(2025, 1, 10, 9, 0)))
+            loaded = tracker.get_state()
+            Replica('desktop', tracker=tracker)
+            self.assertEqual(tracker.get_state(), loaded)
+
+            tracker.mark_habit("Push Ups")
+            self.assertEqual(tracker.get_habit_by_name("Push Ups").current_streak, 9)
+            self.assertEqual(tracker.coins, data['coins'] + tracker.coins_per_completion)
+            restarted = HabitTracker(filename=path)
+            Replica('desktop', tracker=restarted)
+            self.assertEqual(restarted.get_state(), tracker.get_state())
+
+    def test_removed_habit_keeps_its_progress(self):
+        """Test that removing a habit hides it without taking back the XP and coins it earned."""
+        for day in range(5):
+            self.laptop.complete("Push Ups", self.start + timedelta(days=day))
+        progress = self.laptop.tracker.get_progress()
+        self.laptop.remove_habit("Push Ups")
+        self.assertEqual(self.laptop.tracker.habits, [])
+        self.assertEqual(self.laptop.tracker.get_progress(), progress)
+        self.laptop.add_habit("Push Ups", "daily")
+        self.assertEqual(self.laptop.tracker.habits[0].current_streak, 5)
+        self.assertEqual(self.laptop.tracker.get_progress(), progress)
+
+    def test_reward_changes_keep_exchanges(self):
+        """Test that adding and deleting rewards updates them in place without recomputing progress."""
+        for day in range(7):
+            self.laptop.complete("Push Ups", self.start + timedelta(days=day))
+        self.assertTrue(self.laptop.exchange_reward("Movie Night", self.start + timedelta(days=6, hours=12)))
+        progress = self.laptop.tracker.get_progress()
+        with mock.patch.object(self.laptop, '_recompute_progress', side_effect=AssertionError):
+            self.laptop.create_reward("Cake", "hard")
+            self.laptop.delete_reward("Cake")
+        self.assertEqual(self.laptop.tracker.rewards,
+                         [{'name': "Movie Night", 'difficulty': 'easy', 'last_exchanged': '2025-01-07 21:00:00'}])
+        self.assertEqual(self.laptop.tracker.get_progress(), progress)
+
+    def test_cold_history_is_not_counted_twice(self):
+        """Test that a synced tracker with a history store keeps each completion once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = TieredHistoryStore(temp_dir, hot_size=5, segment_size=10)
+            clock = FakeClock(self.start)
+            tracker = HabitTracker(filename=os.path.join(temp_dir, 'habits.json'), history_store=store, clock=clock)
+            tracker.add_habit("Push Ups", "daily")
+            for _ in range(30):
+                tracker.mark_habit("Push Ups")
+                clock.advance(days=1)
+            Replica('desktop', tracker=tracker)
+            for _ in range(20):
+                tracker.mark_habit("Push Ups")
+                clock.advance(days=1)
+            habit = tracker.habits[0]
+            self.assertEqual(store.count(habit), 50)
+            self.assertEqual(len(tracker.get_completion_history(habit)), 50)
+            self.assertLess(len(habit.completion_dates), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()